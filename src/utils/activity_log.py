@@ -0,0 +1,83 @@
+# ------------------------------------------------------------
+#  activity_log.py
+# ------------------------------------------------------------
+import threading
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+DEFAULT_CAPACITY = 1000
+
+
+class ActivityLog:
+    """
+    Bounded ring buffer of recent agent activities with per-agent and
+    per-model aggregates maintained at insert time. Aggregates cover the
+    whole uptime even after old activities fall out of the buffer, so every
+    metrics read is O(1) regardless of history length. Activities carry a
+    monotonically increasing `version`, which `since` uses as a cursor.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self._buffer: Deque[Dict[str, Any]] = deque(maxlen=capacity)
+        self._by_agent: Dict[str, Dict[str, int]] = {}
+        self._by_model: Dict[str, int] = {}
+        self.total = 0
+        self._evicted_version = 0  # newest version that has fallen out of the buffer
+        self._lock = threading.Lock()
+
+    def append(self, activity: Dict[str, Any], version: Optional[Callable[[], int]] = None):
+        """
+        Add an activity. `version()` is called under the log's lock to stamp
+        it, so activities enter the buffer in version order and a reader that
+        saw a version also finds every activity up to it.
+        """
+        with self._lock:
+            if version is not None:
+                activity["version"] = version()
+            if len(self._buffer) == self.capacity:
+                self._evicted_version = self._buffer[0].get("version", 0)
+            self._buffer.append(activity)
+            self.total += 1
+
+            agent = self._by_agent.setdefault(activity["agent_type"], {"actions": 0, "tokens": 0})
+            agent["actions"] += 1
+            agent["tokens"] += activity["tokens_used"]
+            self._by_model[activity["model"]] = self._by_model.get(activity["model"], 0) + activity["tokens_used"]
+
+    def recent(self, limit: int) -> List[Dict[str, Any]]:
+        """Up to `limit` newest activities, oldest first"""
+        with self._lock:
+            if limit >= len(self._buffer):
+                return list(self._buffer)
+            return [self._buffer[i] for i in range(len(self._buffer) - limit, len(self._buffer))]
+
+    def since(self, version: int, until: Optional[int] = None) -> Tuple[List[Dict[str, Any]], bool]:
+        """
+        Activities newer than `version` (and at most `until`), oldest first;
+        True if some were already evicted
+        """
+        with self._lock:
+            newer = []
+            for activity in reversed(self._buffer):
+                if activity.get("version", 0) <= version:
+                    break
+                if until is None or activity.get("version", 0) <= until:
+                    newer.append(activity)
+            newer.reverse()
+            return newer, self._evicted_version > version
+
+    def agent_counts(self, agent_type: str) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._by_agent.get(agent_type, {"actions": 0, "tokens": 0}))
+
+    def model_tokens(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._by_model)
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    def __iter__(self):
+        with self._lock:
+            return iter(list(self._buffer))
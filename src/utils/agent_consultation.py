@@ -0,0 +1,96 @@
+# ------------------------------------------------------------
+#  agent_consultation.py
+# ------------------------------------------------------------
+import asyncio
+import re
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+FIRST_VALID = "first_valid"  # first answer that passes validation wins
+QUORUM = "quorum"            # wait for `quorum` valid answers and merge them
+
+
+class ConsultationFailed(RuntimeError):
+    """No consulted agent produced a valid answer"""
+
+
+def _words(text: str) -> set:
+    return set(re.findall(r"[a-z]{4,}", text.lower()))
+
+
+def merge_by_agreement(answers: List[str]) -> str:
+    """Pick the answer that shares the most vocabulary with the others (the medoid)"""
+    if len(answers) < 3:
+        return answers[0]
+    word_sets = [_words(a) for a in answers]
+
+    def agreement(i: int) -> float:
+        return sum(len(word_sets[i] & other) / max(len(word_sets[i] | other), 1)
+                   for j, other in enumerate(word_sets) if j != i)
+
+    return answers[max(range(len(answers)), key=agreement)]
+
+
+async def consult(candidates: Dict[str, Callable[[], Awaitable[Any]]],
+                  validate: Callable[[Any], bool],
+                  mode: str = FIRST_VALID,
+                  quorum: int = 2,
+                  timeout: Optional[float] = None,
+                  merge: Optional[Callable[[List[Any]], Any]] = None) -> Dict[str, Any]:
+    """
+    Ask several agents the same question concurrently. In FIRST_VALID mode
+    the first answer passing `validate` is returned; in QUORUM mode the
+    first `quorum` valid answers are merged. Calls still running when the
+    outcome is decided are cancelled.
+    """
+    started = time.monotonic()
+    tasks = {asyncio.ensure_future(call()): name for name, call in candidates.items()}
+    needed = 1 if mode == FIRST_VALID else min(quorum, len(tasks))
+    valid: List[Dict[str, Any]] = []
+    rejected: Dict[str, str] = {}
+    failed: Dict[str, str] = {}
+
+    try:
+        pending = set(tasks)
+        while pending and len(valid) < needed:
+            wait_for = None if timeout is None else max(timeout - (time.monotonic() - started), 0)
+            done, pending = await asyncio.wait(pending, timeout=wait_for, return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                break  # consultation timeout
+            for task in done:
+                name = tasks[task]
+                try:
+                    value = task.result()
+                except Exception as e:
+                    failed[name] = f"{type(e).__name__}: {e}"
+                    continue
+                if validate(value):
+                    valid.append({"agent": name, "value": value, "elapsed": time.monotonic() - started})
+                else:
+                    rejected[name] = "failed validation"
+    finally:
+        cancelled = [name for task, name in tasks.items() if not task.done()]
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+
+    if not valid:
+        raise ConsultationFailed(f"No valid answer from {', '.join(candidates)} "
+                                 f"(failed: {failed or 'none'}, rejected: {list(rejected) or 'none'})")
+
+    if mode == QUORUM and len(valid) > 1:
+        answer = (merge or merge_by_agreement)([v["value"] for v in valid])
+    else:
+        answer = valid[0]["value"]
+
+    return {
+        "mode": mode,
+        "answer": answer,
+        "winner": valid[0]["agent"],
+        "quorum_met": len(valid) >= needed,
+        "valid": [{"agent": v["agent"], "elapsed": v["elapsed"]} for v in valid],
+        "rejected": rejected,
+        "failed": failed,
+        "cancelled": cancelled,
+        "elapsed": time.monotonic() - started,
+    }
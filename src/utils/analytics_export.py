@@ -0,0 +1,91 @@
+# ------------------------------------------------------------
+#  analytics_export.py
+# ------------------------------------------------------------
+import json
+from typing import Iterable, Iterator, List, Sequence, Tuple
+
+# Optional Apache Arrow IPC stream output
+try:
+    import pyarrow as pa
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "columnar": "application/x-ndjson",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+JSON_COLUMNS = ("data",)  # columns already holding a JSON document
+FLOAT_COLUMNS = {"ts", "started_at", "latency", "cost_usd", "resolution_time_seconds"}
+INT_COLUMNS = {"tokens", "prompt_tokens", "cached_tokens", "completion_tokens", "total_tokens", "estimated", "status"}
+
+
+def ndjson_stream(columns: Sequence[str], chunks: Iterable[List[Tuple]]) -> Iterator[str]:
+    """One JSON object per row, one string per chunk"""
+    for rows in chunks:
+        lines = []
+        for row in rows:
+            if columns[-1] in JSON_COLUMNS:
+                lines.append(row[-1])  # the stored document is the full record
+            else:
+                lines.append(json.dumps(dict(zip(columns, row)), separators=(",", ":")))
+        yield "\n".join(lines) + "\n"
+
+
+def columnar_stream(dataset: str, columns: Sequence[str], chunks: Iterable[List[Tuple]]) -> Iterator[str]:
+    """
+    Compact column-major NDJSON: a header line naming the columns, then one
+    line per chunk holding one array per column. Repeated keys are not
+    written per row, and numeric columns compress well downstream.
+    """
+    keep = [i for i, name in enumerate(columns) if name not in JSON_COLUMNS]
+    yield json.dumps({"dataset": dataset, "columns": [columns[i] for i in keep]}) + "\n"
+    for rows in chunks:
+        yield json.dumps([[row[i] for row in rows] for i in keep], separators=(",", ":")) + "\n"
+
+
+class _ChunkSink:
+    """File-like sink the Arrow writer fills; drained after every record batch"""
+
+    def __init__(self):
+        self.parts: List[bytes] = []
+        self.closed = False
+
+    def write(self, data) -> int:
+        self.parts.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data, self.parts = b"".join(self.parts), []
+        return data
+
+
+def arrow_stream(columns: Sequence[str], chunks: Iterable[List[Tuple]]) -> Iterator[bytes]:
+    """Arrow IPC stream, one record batch per chunk (requires pyarrow)"""
+    if not PYARROW_AVAILABLE:
+        raise RuntimeError("pyarrow is not installed")
+    keep = [i for i, name in enumerate(columns) if name not in JSON_COLUMNS]
+    schema = pa.schema([(columns[i], _arrow_type(columns[i])) for i in keep])
+    sink = _ChunkSink()
+    writer = pa.ipc.new_stream(sink, schema)
+    for rows in chunks:
+        arrays = [pa.array([row[i] for row in rows], type=field.type) for i, field in zip(keep, schema)]
+        writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=schema))
+        yield sink.drain()
+    writer.close()
+    yield sink.drain()
+
+
+def _arrow_type(column: str):
+    if column in FLOAT_COLUMNS:
+        return pa.float64()
+    if column in INT_COLUMNS:
+        return pa.int64()
+    return pa.string()
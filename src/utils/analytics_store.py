@@ -0,0 +1,356 @@
+# ------------------------------------------------------------
+#  analytics_store.py
+# ------------------------------------------------------------
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from metrics_core import ShardedCounter
+
+store_logger = logging.getLogger('agentic_ai_store')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS activities (
+    ts REAL NOT NULL,
+    agent_type TEXT NOT NULL,
+    model TEXT,
+    incident_id TEXT,
+    action TEXT,
+    tokens INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_activities_ts ON activities (ts);
+CREATE INDEX IF NOT EXISTS idx_activities_agent_ts ON activities (agent_type, ts);
+CREATE INDEX IF NOT EXISTS idx_activities_model_ts ON activities (model, ts);
+
+CREATE TABLE IF NOT EXISTS usage (
+    ts REAL NOT NULL,
+    agent_type TEXT NOT NULL,
+    model TEXT NOT NULL,
+    incident_id TEXT,
+    prompt_tokens INTEGER NOT NULL DEFAULT 0,
+    cached_tokens INTEGER NOT NULL DEFAULT 0,
+    completion_tokens INTEGER NOT NULL DEFAULT 0,
+    total_tokens INTEGER NOT NULL DEFAULT 0,
+    cost_usd REAL NOT NULL DEFAULT 0,
+    estimated INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_usage_ts ON usage (ts);
+CREATE INDEX IF NOT EXISTS idx_usage_agent_ts ON usage (agent_type, ts);
+CREATE INDEX IF NOT EXISTS idx_usage_model_ts ON usage (model, ts);
+
+CREATE TABLE IF NOT EXISTS incidents (
+    id TEXT PRIMARY KEY,
+    started_at REAL NOT NULL,
+    service TEXT,
+    severity TEXT,
+    status TEXT,
+    resolution_time_seconds REAL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_incidents_started ON incidents (started_at);
+
+CREATE TABLE IF NOT EXISTS requests (
+    ts REAL NOT NULL,
+    endpoint TEXT NOT NULL,
+    method TEXT,
+    status INTEGER,
+    latency REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_requests_ts ON requests (ts);
+"""
+
+INSERTS = {
+    "activities": "INSERT INTO activities (ts, agent_type, model, incident_id, action, tokens) VALUES (?, ?, ?, ?, ?, ?)",
+    "usage": "INSERT INTO usage (ts, agent_type, model, incident_id, prompt_tokens, cached_tokens, completion_tokens, "
+             "total_tokens, cost_usd, estimated) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+    "incidents": "INSERT OR REPLACE INTO incidents (id, started_at, service, severity, status, "
+                 "resolution_time_seconds, data) VALUES (?, ?, ?, ?, ?, ?, ?)",
+    "requests": "INSERT INTO requests (ts, endpoint, method, status, latency) VALUES (?, ?, ?, ?, ?)",
+}
+TIME_COLUMNS = {"activities": "ts", "usage": "ts", "incidents": "started_at", "requests": "ts"}
+EXPORT_COLUMNS = {
+    "activities": ("ts", "agent_type", "model", "incident_id", "action", "tokens"),
+    "usage": ("ts", "agent_type", "model", "incident_id", "prompt_tokens", "cached_tokens", "completion_tokens",
+              "total_tokens", "cost_usd", "estimated"),
+    "incidents": ("id", "started_at", "service", "severity", "status", "resolution_time_seconds", "data"),
+    "requests": ("ts", "endpoint", "method", "status", "latency"),
+}
+USAGE_GROUPS = ("agent_type", "model", "incident_id")
+
+_STOP = object()
+
+
+class AnalyticsStore:
+    """
+    Embedded SQLite (WAL) store for analytics history. Callers only enqueue
+    rows; one writer thread commits them in batches, so request threads
+    never wait on disk. Reads use per-thread connections, which WAL lets run
+    alongside the writer. Rows older than `retention_days` are pruned.
+    """
+
+    def __init__(self, path: str, retention_days: float = 30, batch_size: int = 500,
+                 flush_interval: float = 1.0, max_queue: int = 50_000):
+        self.path = path
+        self.retention_seconds = retention_days * 86400
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max_queue)
+        self._local = threading.local()
+        self.enqueue_counts = ShardedCounter(("enqueued", "dropped"))  # bumped from every producer thread
+        self.stats_counters = {"written": 0, "batches": 0, "pruned": 0,  # writer thread only
+                               "errors": 0, "last_batch_ms": 0.0}
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        conn = sqlite3.connect(path)
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")  # must precede WAL and the first table of a new database
+        conn.close()
+        conn = self._connect()
+        conn.executescript(SCHEMA)
+        conn.close()
+
+        self._thread = threading.Thread(target=self._run, name="analytics-store", daemon=True)
+        self._thread.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")  # durable at checkpoints; fine for analytics
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    # ---- writes (any thread, never block) ----
+
+    def _enqueue(self, table: str, row: Tuple):
+        try:
+            self._queue.put_nowait((table, row))
+            self.enqueue_counts.add("enqueued")
+        except queue.Full:
+            self.enqueue_counts.add("dropped")
+
+    def record_activity(self, activity: Dict[str, Any], ts: Optional[float] = None):
+        self._enqueue("activities", (ts or time.time(), activity["agent_type"], activity.get("model"),
+                                     activity.get("incident_id"), activity.get("action"),
+                                     activity.get("tokens_used", 0)))
+
+    def record_usage(self, entry: Dict[str, Any]):
+        self._enqueue("usage", (entry["timestamp"], entry["agent_type"], entry["model"], entry.get("incident_id"),
+                                entry["prompt_tokens"], entry["cached_tokens"], entry["completion_tokens"],
+                                entry["total_tokens"], entry["cost_usd"], int(entry.get("estimated", False))))
+
+    def record_incident(self, incident: Dict[str, Any]):
+        """Upsert the latest snapshot of an incident"""
+        self._enqueue("incidents", (incident["id"], incident["started_at"], incident.get("service"),
+                                    incident.get("severity"), incident.get("status"),
+                                    incident.get("resolution_time_seconds"), json.dumps(incident, default=str)))
+
+    def record_request(self, endpoint: str, method: str, status: int, latency: float):
+        self._enqueue("requests", (time.time(), endpoint, method, status, latency))
+
+    # ---- writer thread ----
+
+    def _run(self):
+        conn = self._connect()
+        last_prune = 0.0
+        stopping = False
+        while not stopping:
+            batch: List[Tuple[str, Tuple]] = []
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+                if item is _STOP:
+                    stopping = True
+                else:
+                    batch.append(item)
+            except queue.Empty:
+                pass
+            while not stopping and len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                else:
+                    batch.append(item)
+
+            if batch:
+                self._write(conn, batch)
+            if time.time() - last_prune > 3600 or stopping:
+                self._prune(conn)
+                last_prune = time.time()
+        conn.close()
+
+    def _write(self, conn: sqlite3.Connection, batch: List[Tuple[str, Tuple]]):
+        started = time.perf_counter()
+        by_table: Dict[str, List[Tuple]] = {}
+        for table, row in batch:
+            by_table.setdefault(table, []).append(row)
+        try:
+            with conn:
+                for table, rows in by_table.items():
+                    conn.executemany(INSERTS[table], rows)
+            self.stats_counters["written"] += len(batch)
+            self.stats_counters["batches"] += 1
+            self.stats_counters["last_batch_ms"] = (time.perf_counter() - started) * 1000
+        except sqlite3.Error as e:
+            self.stats_counters["errors"] += 1
+            store_logger.error(f"💾 [STORE] Failed to write {len(batch)} analytics rows: {e}")
+
+    def _prune(self, conn: sqlite3.Connection):
+        """Retention: drop rows past the horizon, then give freed pages back and truncate the WAL"""
+        cutoff = time.time() - self.retention_seconds
+        try:
+            with conn:
+                pruned = sum(conn.execute(f"DELETE FROM {table} WHERE {column} < ?", (cutoff,)).rowcount
+                             for table, column in TIME_COLUMNS.items())
+            if pruned:
+                conn.execute("PRAGMA incremental_vacuum")
+                store_logger.info(f"💾 [STORE] Retention pruned {pruned} rows older than "
+                                  f"{self.retention_seconds / 86400:.0f} days")
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            self.stats_counters["pruned"] += pruned
+        except sqlite3.Error as e:
+            self.stats_counters["errors"] += 1
+            store_logger.error(f"💾 [STORE] Retention pass failed: {e}")
+
+    # ---- reads ----
+
+    def _reader(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+            conn.execute("PRAGMA query_only = ON")
+        return conn
+
+    @staticmethod
+    def _range(column: str, start: Optional[float], end: Optional[float]):
+        clauses, params = [], []
+        if start is not None:
+            clauses.append(f"{column} >= ?")
+            params.append(start)
+        if end is not None:
+            clauses.append(f"{column} < ?")
+            params.append(end)
+        return clauses, params
+
+    def activities(self, start: Optional[float] = None, end: Optional[float] = None,
+                   agent_type: Optional[str] = None, model: Optional[str] = None,
+                   limit: int = 500) -> List[Dict[str, Any]]:
+        """Activities in [start, end), newest first"""
+        clauses, params = self._range("ts", start, end)
+        for column, value in (("agent_type", agent_type), ("model", model)):
+            if value:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self._reader().execute(
+            f"SELECT * FROM activities {where} ORDER BY ts DESC LIMIT ?", (*params, limit)).fetchall()
+        return [dict(row) for row in rows]
+
+    def usage_summary(self, start: Optional[float] = None, end: Optional[float] = None,
+                      group_by: str = "model", bucket_seconds: Optional[int] = None,
+                      agent_type: Optional[str] = None, model: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Token/cost totals per agent, model or incident, optionally per time bucket"""
+        if group_by not in USAGE_GROUPS:
+            raise ValueError(f"group_by must be one of {', '.join(USAGE_GROUPS)}")
+        clauses, params = self._range("ts", start, end)
+        for column, value in (("agent_type", agent_type), ("model", model)):
+            if value:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        keys = [group_by]
+        if bucket_seconds:
+            keys.insert(0, f"CAST(ts / {int(bucket_seconds)} AS INTEGER) * {int(bucket_seconds)} AS bucket")
+        group = ", ".join(k.split(" AS ")[-1] for k in keys)
+        rows = self._reader().execute(
+            f"SELECT {', '.join(keys)}, COUNT(*) AS calls, SUM(prompt_tokens) AS prompt_tokens, "
+            f"SUM(cached_tokens) AS cached_tokens, SUM(completion_tokens) AS completion_tokens, "
+            f"SUM(total_tokens) AS total_tokens, SUM(cost_usd) AS cost_usd "
+            f"FROM usage {where} GROUP BY {group} ORDER BY {group}", params).fetchall()
+        return [dict(row) for row in rows]
+
+    def incidents(self, start: Optional[float] = None, end: Optional[float] = None,
+                  service: Optional[str] = None, limit: int = 200) -> List[Dict[str, Any]]:
+        clauses, params = self._range("started_at", start, end)
+        if service:
+            clauses.append("service = ?")
+            params.append(service)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self._reader().execute(
+            f"SELECT data FROM incidents {where} ORDER BY started_at DESC LIMIT ?", (*params, limit)).fetchall()
+        return [json.loads(row["data"]) for row in rows]
+
+    def series_points(self, series: str, start: Optional[float] = None, end: Optional[float] = None,
+                      bucket_seconds: int = 60, endpoint: Optional[str] = None) -> Iterator[Tuple[float, float]]:
+        """
+        Raw (time, value) points for charting, in time order:
+        response_time - per-request latency (optionally for one endpoint);
+        token_rate - tokens per second, summed per `bucket_seconds`;
+        incidents - resolution time of each incident, by start time.
+        """
+        if series == "response_time":
+            clauses, params = self._range("ts", start, end)
+            if endpoint:
+                clauses.append("endpoint = ?")
+                params.append(endpoint)
+            sql = "SELECT ts, latency FROM requests"
+            order = "ts"
+        elif series == "token_rate":
+            clauses, params = self._range("ts", start, end)
+            bucket = max(int(bucket_seconds), 1)
+            sql = (f"SELECT CAST(ts / {bucket} AS INTEGER) * {bucket} AS bucket, "
+                   f"SUM(total_tokens) * 1.0 / {bucket} FROM usage")
+            order = "bucket"
+        elif series == "incidents":
+            clauses, params = self._range("started_at", start, end)
+            sql = "SELECT started_at, resolution_time_seconds FROM incidents"
+            order = "started_at"
+        else:
+            raise ValueError(f"Unknown series '{series}'")
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        group = " GROUP BY bucket" if series == "token_rate" else ""
+        cursor = self._reader().execute(f"{sql}{where}{group} ORDER BY {order}", params)
+        while True:
+            rows = cursor.fetchmany(5000)
+            if not rows:
+                break
+            for row in rows:
+                yield row[0], row[1]
+
+    def export_chunks(self, dataset: str, start: Optional[float] = None, end: Optional[float] = None,
+                      chunk_size: int = 1000) -> Iterator[List[Tuple]]:
+        """
+        Rows of one table in time order, `chunk_size` at a time, from a
+        dedicated connection; memory stays constant whatever the range.
+        """
+        if dataset not in EXPORT_COLUMNS:
+            raise ValueError(f"Unknown dataset '{dataset}'")
+        column = TIME_COLUMNS[dataset]
+        clauses, params = self._range(column, start, end)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            cursor = conn.execute(f"SELECT {', '.join(EXPORT_COLUMNS[dataset])} FROM {dataset} {where} "
+                                  f"ORDER BY {column}", params)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield rows
+        finally:
+            conn.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.enqueue_counts.snapshot(), **self.stats_counters, "queued": self._queue.qsize(), "path": self.path,
+                "retention_days": self.retention_seconds / 86400}
+
+    def close(self, timeout: float = 5.0):
+        """Flush queued rows and stop the writer"""
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
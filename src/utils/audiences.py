@@ -0,0 +1,56 @@
+# ------------------------------------------------------------
+#  audiences.py
+# ------------------------------------------------------------
+from typing import Any, Dict, Tuple
+
+# One Socket.IO room per page type; a socket joins only after it subscribes
+STOREFRONT = "storefront"
+SEARCH = "search"
+ANALYTICS = "analytics"
+AUDIENCES = (STOREFRONT, SEARCH, ANALYTICS)
+
+INCIDENT_ROOM_PREFIX = "incident:"
+
+# Sockets that asked for MessagePack join "<room>#msgpack" instead of "<room>", plus this room for dictionary updates
+COMPACT_SUFFIX = "#msgpack"
+COMPACT_ROOM = "encoding#msgpack"
+
+# Which audiences render each broadcast event; per-incident events go to incident rooms only
+EVENT_AUDIENCES: Dict[str, Tuple[str, ...]] = {
+    "banner_update": (STOREFRONT, SEARCH),
+    "banner_remove": (STOREFRONT, SEARCH),
+    "banners_clear": (STOREFRONT, SEARCH),
+    "system_status": (STOREFRONT,),
+    "system_metrics": (STOREFRONT,),
+    "analytics_delta": (ANALYTICS,),  # carries new activities too
+}
+
+
+class SubscriptionError(ValueError):
+    """A subscribe request naming an unknown audience or incident"""
+
+
+def rooms_for(event: str) -> Tuple[str, ...]:
+    return EVENT_AUDIENCES.get(event, ())
+
+
+def incident_room(incident_id: str) -> str:
+    return f"{INCIDENT_ROOM_PREFIX}{incident_id}"
+
+
+def compact_room(room: str) -> str:
+    return f"{room}{COMPACT_SUFFIX}"
+
+
+def parse_subscription(data: Any) -> Tuple[str, str]:
+    """`{"audience": "storefront"}` or `{"incident": "INC-..."}` -> (kind, value)"""
+    if not isinstance(data, dict):
+        raise SubscriptionError("Subscription must be an object with 'audience' or 'incident'")
+    if "audience" in data:
+        audience = data["audience"]
+        if audience not in AUDIENCES:
+            raise SubscriptionError(f"Unknown audience '{audience}' (expected one of {', '.join(AUDIENCES)})")
+        return "audience", audience
+    if data.get("incident"):
+        return "incident", str(data["incident"])
+    raise SubscriptionError("Subscription must name an 'audience' or an 'incident'")
@@ -0,0 +1,63 @@
+# ------------------------------------------------------------
+#  cancellation.py
+# ------------------------------------------------------------
+import logging
+import threading
+from typing import Callable, List, Optional
+
+cancellation_logger = logging.getLogger('agentic_ai_cancellation')
+
+
+class OperationCancelled(Exception):
+    """Raised when work is abandoned because its cancellation token fired"""
+
+
+class CancellationToken:
+    """
+    Cooperative cancellation shared between the thread that owns some work
+    and the code doing it. Work checks the token between steps; owners
+    register callbacks to cancel timers, tasks or other resources promptly.
+    """
+
+    def __init__(self, name: str = ""):
+        self.name = name
+        self.reason: Optional[str] = None
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks: List[Callable[[], None]] = []
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self, reason: str = "cancelled") -> bool:
+        """Fire the token once; returns False if it was already cancelled"""
+        with self._lock:
+            if self._event.is_set():
+                return False
+            self.reason = reason
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                cancellation_logger.error(f"⛔ [CANCEL] Callback for {self.name or 'token'} failed: {e}")
+        return True
+
+    def on_cancel(self, callback: Callable[[], None]):
+        """Run `callback` when the token fires (immediately if it already has)"""
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return
+        callback()
+
+    def raise_if_cancelled(self, operation: str = "operation"):
+        if self._event.is_set():
+            raise OperationCancelled(f"{operation} cancelled: {self.reason}")
+
+    def wait(self, timeout: float) -> bool:
+        """Cancellable sleep; True if the token fired before `timeout`"""
+        return self._event.wait(timeout)
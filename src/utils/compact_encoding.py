@@ -0,0 +1,110 @@
+# ------------------------------------------------------------
+#  compact_encoding.py
+# ------------------------------------------------------------
+import json
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+# Optional MessagePack for binary Socket.IO payloads
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+JSON = "json"
+MSGPACK = "msgpack"
+ENCODINGS = (JSON, MSGPACK)
+
+# Activities travel as rows in this field order; "agent" indexes the session dictionary
+ACTIVITY_FIELDS = ("id", "timestamp", "agent", "action", "tokens_used", "incident_id", "version")
+AGENT_FIELDS = ("agent_type", "agent_name", "model", "model_description")
+
+# Payload keys holding activity lists, per event (None = the payload itself is the list)
+ACTIVITY_KEYS = {
+    "agent_activities": (None,),
+    "analytics_delta": ("new_activities", "recent_activities"),
+}
+
+
+class CompactEncoder:
+    """
+    MessagePack encoding for real-time events. Activities become rows, and
+    the agent name/model/description repeated on every activity are replaced
+    by an index into a dictionary the client receives once per session (new
+    entries are announced as they appear). Keeps JSON vs. compact byte counts
+    per event.
+    """
+
+    def __init__(self):
+        if not MSGPACK_AVAILABLE:
+            raise RuntimeError("msgpack is not installed")
+        self._lock = threading.Lock()
+        self._agents: List[Tuple] = []
+        self._agent_index: Dict[Tuple, int] = {}
+        self.bytes_by_event: Dict[str, Dict[str, int]] = {}
+
+    def dictionary(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"activity_fields": ACTIVITY_FIELDS, "agent_fields": AGENT_FIELDS,
+                    "agents": [list(entry) for entry in self._agents]}
+
+    def _agent(self, activity: Dict[str, Any], new_entries: Dict[int, List]) -> int:
+        entry = tuple(activity.get(field) for field in AGENT_FIELDS)
+        index = self._agent_index.get(entry)
+        if index is None:
+            index = self._agent_index[entry] = len(self._agents)
+            self._agents.append(entry)
+            new_entries[index] = list(entry)
+        return index
+
+    def _rows(self, activities: List[Dict[str, Any]], new_entries: Dict[int, List]) -> List[List]:
+        rows = []
+        for activity in activities:
+            agent = self._agent(activity, new_entries)
+            rows.append([agent if field == "agent" else activity.get(field) for field in ACTIVITY_FIELDS])
+        return rows
+
+    def encode(self, event: str, payload: Any) -> Tuple[bytes, Optional[Dict[int, List]]]:
+        """Binary payload plus any dictionary entries the clients must learn first"""
+        new_entries: Dict[int, List] = {}
+        compact = payload
+        with self._lock:
+            for key in ACTIVITY_KEYS.get(event, ()):
+                if key is None:
+                    compact = self._rows(payload, new_entries)
+                elif isinstance(payload, dict) and key in payload:
+                    compact = dict(compact) if compact is payload else compact
+                    compact[key] = self._rows(payload[key], new_entries)
+        data = msgpack.packb(compact, use_bin_type=True, default=str)
+        self.record(event, payload, len(data))
+        return data, new_entries or None
+
+    def record(self, event: str, payload: Any, compact_bytes: int):
+        json_bytes = len(json.dumps(payload, separators=(",", ":"), default=str).encode())
+        with self._lock:
+            counts = self.bytes_by_event.setdefault(event, {"messages": 0, "json_bytes": 0, "compact_bytes": 0})
+            counts["messages"] += 1
+            counts["json_bytes"] += json_bytes
+            counts["compact_bytes"] += compact_bytes
+
+    def report(self) -> Dict[str, Any]:
+        """Average bytes per message for each event, as JSON and as compact MessagePack"""
+        with self._lock:
+            events = {}
+            for event, counts in self.bytes_by_event.items():
+                messages = counts["messages"]
+                events[event] = {
+                    **counts,
+                    "json_bytes_per_message": counts["json_bytes"] / messages,
+                    "compact_bytes_per_message": counts["compact_bytes"] / messages,
+                    "saving": 1 - counts["compact_bytes"] / counts["json_bytes"] if counts["json_bytes"] else 0.0,
+                }
+            return {"encoding": MSGPACK, "dictionary_agents": len(self._agents), "events": events}
+
+
+def parse_encoding(data: Any) -> str:
+    encoding = data.get("encoding", JSON) if isinstance(data, dict) else JSON
+    if encoding not in ENCODINGS:
+        raise ValueError(f"Unknown encoding '{encoding}' (expected one of {', '.join(ENCODINGS)})")
+    return encoding
@@ -0,0 +1,77 @@
+# ------------------------------------------------------------
+#  deadlines.py
+# ------------------------------------------------------------
+import contextvars
+import functools
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+# Absolute time.monotonic() deadline of the current request (None = no budget)
+_current_deadline: contextvars.ContextVar = contextvars.ContextVar("request_deadline", default=None)
+
+# Smallest timeout handed to a downstream call; below this we fail fast instead
+MIN_CALL_TIMEOUT = 0.05
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when the request time budget is exhausted"""
+
+
+@contextmanager
+def deadline(seconds: float):
+    """Set a time budget for the enclosed work; nested budgets can only shrink it"""
+    new_deadline = time.monotonic() + seconds
+    outer = _current_deadline.get()
+    if outer is not None:
+        new_deadline = min(new_deadline, outer)
+    token = _current_deadline.set(new_deadline)
+    try:
+        yield new_deadline
+    finally:
+        _current_deadline.reset(token)
+
+
+def with_deadline(seconds: float):
+    """Decorator form of `deadline` for Flask routes"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with deadline(seconds):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def remaining() -> Optional[float]:
+    """Seconds left in the current budget, or None when no deadline is set"""
+    current = _current_deadline.get()
+    if current is None:
+        return None
+    return current - time.monotonic()
+
+
+def check(operation: str = "request"):
+    """Fail fast if the budget is already spent"""
+    left = remaining()
+    if left is not None and left <= 0:
+        raise DeadlineExceeded(f"Deadline exceeded before {operation}")
+
+
+def timeout_for(default: float, operation: str = "call") -> float:
+    """Timeout for a downstream call: the remaining budget capped at `default`"""
+    left = remaining()
+    if left is None:
+        return default
+    if left <= MIN_CALL_TIMEOUT:
+        raise DeadlineExceeded(f"Deadline exceeded before {operation}")
+    return min(default, left)
+
+
+def sleep(seconds: float, operation: str = "wait"):
+    """time.sleep that never outlives the budget"""
+    left = remaining()
+    if left is not None and seconds > left:
+        time.sleep(max(left, 0))
+        raise DeadlineExceeded(f"Deadline exceeded during {operation}")
+    time.sleep(seconds)
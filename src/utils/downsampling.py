@@ -0,0 +1,79 @@
+# ------------------------------------------------------------
+#  downsampling.py
+# ------------------------------------------------------------
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Iterable, List, Tuple
+
+
+def lttb(points: Iterable[Tuple[float, float]], threshold: int) -> List[Tuple[float, float]]:
+    """
+    Largest-Triangle-Three-Buckets: reduce (x, y) points sorted by x to
+    `threshold` points that keep the visual shape (peaks and dips survive).
+    Points are held in compact float arrays; the pass itself is O(n).
+    """
+    xs, ys = array('d'), array('d')
+    for x, y in points:
+        if y is None:
+            continue
+        xs.append(x)
+        ys.append(y)
+    n = len(xs)
+    if threshold >= n or threshold < 3:
+        return list(zip(xs, ys))
+
+    sampled = [(xs[0], ys[0])]
+    every = (n - 2) / (threshold - 2)
+    a = 0
+    for i in range(threshold - 2):
+        # Average of the next bucket is the third triangle vertex
+        next_start = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, n)
+        span = next_end - next_start
+        avg_x = sum(xs[next_start:next_end]) / span
+        avg_y = sum(ys[next_start:next_end]) / span
+
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        ax, ay = xs[a], ys[a]
+        best, best_area = start, -1.0
+        for j in range(start, end):
+            area = abs((ax - avg_x) * (ys[j] - ay) - (ax - xs[j]) * (avg_y - ay))
+            if area > best_area:
+                best, best_area = j, area
+        sampled.append((xs[best], ys[best]))
+        a = best
+
+    sampled.append((xs[-1], ys[-1]))
+    return sampled
+
+
+class SeriesCache:
+    """Small LRU of downsampled series keyed by (series, window, resolution, time slot)"""
+
+    def __init__(self, max_entries: int = 64):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats_counters = {"hits": 0, "misses": 0}
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.stats_counters["hits"] += 1
+                return self._entries[key]
+            self.stats_counters["misses"] += 1
+        value = compute()
+        with self._lock:
+            self._entries[key] = value
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.stats_counters["hits"] + self.stats_counters["misses"]
+            return {**self.stats_counters, "entries": len(self._entries),
+                    "hit_ratio": self.stats_counters["hits"] / total if total else 0.0}
@@ -0,0 +1,120 @@
+# ------------------------------------------------------------
+#  emission.py
+# ------------------------------------------------------------
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Optional, Tuple
+
+emission_logger = logging.getLogger('agentic_ai_emission')
+
+EmitFunc = Callable[[str, Any, Optional[str]], None]  # (event, payload, room or None for the default rooms)
+
+
+class EmitScheduler:
+    """
+    Coalesces real-time events and sends them on a fixed tick (default 10 Hz).
+    Batched events queue items that go out as one list per tick. Watched
+    channels are checked once per tick with a cheap change key and their
+    payload is built and sent only when the key changed, however many
+    updates happened in between. Callers never block on payload building
+    or on the Socket.IO fan-out.
+    """
+
+    def __init__(self, emit: EmitFunc, interval: float = 0.1, max_batch: int = 500):
+        self.emit = emit
+        self.interval = interval
+        self.max_batch = max_batch
+        self._lock = threading.Lock()
+        self._batches: Dict[Tuple[str, Optional[str]], deque] = {}
+        self._watches: Dict[str, Dict[str, Any]] = {}
+        self.stats_counters = {"ticks": 0, "flushes": 0, "queued": 0, "batched_messages": 0,
+                               "dropped": 0, "snapshots_sent": 0, "errors": 0, "last_flush_ms": 0.0}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="emit-scheduler", daemon=True)
+        self._thread.start()
+
+    def queue(self, event: str, item: Any, room: Optional[str] = None):
+        """Add one item to this tick's batch for `event` (and `room`)"""
+        with self._lock:
+            batch = self._batches.get((event, room))
+            if batch is None:
+                batch = self._batches[(event, room)] = deque(maxlen=self.max_batch)
+            if len(batch) == self.max_batch:
+                self.stats_counters["dropped"] += 1  # a burst larger than one message keeps the newest items
+            batch.append(item)
+            self.stats_counters["queued"] += 1
+
+    def watch(self, event: str, key: Callable[[], Any],
+              build: Optional[Callable[[Any, Any], Any]] = None, send_initial: bool = False):
+        """
+        Send `event` on ticks where `key()` changed. The payload is
+        `build(previous_key, key)` (skipped when it returns None), or the key
+        itself. The first key is only recorded unless `send_initial`.
+        """
+        with self._lock:
+            self._watches[event] = {"key": key, "build": build, "last": None, "primed": send_initial}
+
+    def _run(self):
+        next_tick = time.monotonic()
+        while not self._stop.is_set():
+            next_tick += self.interval
+            self._stop.wait(max(0.0, next_tick - time.monotonic()))
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            self.stats_counters["ticks"] += 1
+            batches, self._batches = self._batches, {}
+            watches = list(self._watches.items())
+
+        started = time.perf_counter()
+        for (event, room), items in batches.items():
+            self._send(event, list(items), room)
+        snapshots = 0
+        for event, watch in watches:
+            try:
+                current = watch["key"]()
+                if watch["primed"] and current == watch["last"]:
+                    continue
+                previous, watch["last"] = watch["last"], current
+                if not watch["primed"]:
+                    watch["primed"] = True
+                    continue
+                payload = watch["build"](previous, current) if watch["build"] else current
+            except Exception as e:
+                emission_logger.error(f"⚠️ [EMIT] Building '{event}' snapshot failed: {e}")
+                with self._lock:
+                    self.stats_counters["errors"] += 1
+                continue
+            if payload is not None:
+                self._send(event, payload)
+                snapshots += 1
+        if not batches and not snapshots:
+            return
+        with self._lock:
+            self.stats_counters["flushes"] += 1
+            self.stats_counters["batched_messages"] += len(batches)
+            self.stats_counters["snapshots_sent"] += snapshots
+            self.stats_counters["last_flush_ms"] = (time.perf_counter() - started) * 1000
+
+    def _send(self, event: str, payload: Any, room: Optional[str] = None):
+        try:
+            self.emit(event, payload, room)
+        except Exception as e:
+            emission_logger.error(f"⚠️ [EMIT] Sending '{event}' failed: {e}")
+            with self._lock:
+                self.stats_counters["errors"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            pending = sum(len(items) for items in self._batches.values())
+            return {**self.stats_counters, "pending": pending, "watched": sorted(self._watches),
+                    "interval_seconds": self.interval}
+
+    def shutdown(self):
+        """Stop ticking and send whatever is still buffered"""
+        self._stop.set()
+        self._thread.join(timeout=2)
+        self.flush()
@@ -0,0 +1,138 @@
+# ------------------------------------------------------------
+#  incident_correlation.py
+# ------------------------------------------------------------
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+DEFAULT_WINDOW_SECONDS = 120.0
+
+
+class FailureCorrelator:
+    """
+    Folds a flood of failures into the incident that is already open for
+    them. Failures are fingerprinted by (service, error class, time window);
+    a fingerprint seen again within the window - or any failure on a service
+    that already has an open incident - is counted as a duplicate instead of
+    opening a new incident and launching new agent work.
+    """
+
+    def __init__(self, window_seconds: float = DEFAULT_WINDOW_SECONDS):
+        self.window_seconds = window_seconds
+        self._lock = threading.Lock()
+        # (service, error_class) -> {"incident_id", "first_seen", "last_seen", "count"}
+        self._active: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        # service -> incident_id of the open incident failures are folded into
+        self._by_service: Dict[str, str] = {}
+        # incident_id -> number of failures folded into it
+        self._duplicates: Dict[str, int] = {}
+        # service -> {"owner": thread id, "done": Event} while its incident is being opened
+        self._opening: Dict[str, Dict[str, Any]] = {}
+        self.stats = {"failures": 0, "suppressed": 0, "incidents_opened": 0, "unhandled": 0}
+
+    def fingerprint(self, service: str, error_class: str, timestamp: Optional[float] = None) -> str:
+        window = int((timestamp if timestamp is not None else time.time()) // self.window_seconds)
+        return f"{service}:{error_class}:{window}"
+
+    def correlate(self, service: str, error_class: str,
+                  open_incident: Callable[[], Optional[str]],
+                  is_open: Callable[[str], bool]) -> Dict[str, Any]:
+        """
+        Attach one failure to an incident. `open_incident` is called only when
+        nothing open matches and returns the new incident id (or None when no
+        incident should be opened, e.g. auto-resolution is disabled). It runs
+        outside the lock: the service's slot is reserved first, and failures
+        arriving meanwhile wait for it and fold into the incident it opened.
+        """
+        key = (service, error_class)
+        while True:
+            with self._lock:
+                now = time.time()
+                incident_id = self._match(key, now, is_open)
+                if incident_id:
+                    self.stats["failures"] += 1
+                    self.stats["suppressed"] += 1
+                    self._duplicates[incident_id] = self._duplicates.get(incident_id, 0) + 1
+                    return self._record(key, incident_id, now, suppressed=True)
+
+                opening = self._opening.get(service)
+                if opening is None:
+                    opening = self._opening[service] = {"owner": threading.get_ident(), "done": threading.Event()}
+                    self.stats["failures"] += 1
+                    self._sweep(now, is_open)
+                    break
+                if opening["owner"] == threading.get_ident():
+                    # Reported from inside open_incident(): the incident being opened covers it
+                    self.stats["failures"] += 1
+                    self.stats["suppressed"] += 1
+                    return {"incident_id": None, "suppressed": True, "duplicates": 0,
+                            "fingerprint": self.fingerprint(service, error_class, now)}
+            opening["done"].wait()
+
+        incident_id = None
+        try:
+            incident_id = open_incident()
+        finally:
+            with self._lock:
+                del self._opening[service]
+                if incident_id is None:
+                    self.stats["unhandled"] += 1
+                    result = {"incident_id": None, "suppressed": False, "duplicates": 0,
+                              "fingerprint": self.fingerprint(service, error_class, now)}
+                else:
+                    self.stats["incidents_opened"] += 1
+                    self._by_service[service] = incident_id
+                    self._duplicates[incident_id] = 0
+                    result = self._record(key, incident_id, now, suppressed=False)
+            opening["done"].set()
+        return result
+
+    def _match(self, key: Tuple[str, str], now: float, is_open: Callable[[str], bool]) -> Optional[str]:
+        """Open incident this failure belongs to, if any"""
+        entry = self._active.get(key)
+        if entry and now - entry["last_seen"] <= self.window_seconds and is_open(entry["incident_id"]):
+            return entry["incident_id"]
+        service = key[0]
+        if service in self._by_service and is_open(self._by_service[service]):
+            # Different error class, same outage: correlate into the open incident
+            return self._by_service[service]
+        return None
+
+    def _record(self, key: Tuple[str, str], incident_id: str, now: float, suppressed: bool) -> Dict[str, Any]:
+        entry = self._active.get(key)
+        if entry is None or entry["incident_id"] != incident_id:
+            entry = {"incident_id": incident_id, "first_seen": now, "last_seen": now, "count": 0}
+            self._active[key] = entry
+        entry["last_seen"] = now
+        entry["count"] += 1
+        return {
+            "incident_id": incident_id,
+            "suppressed": suppressed,
+            "duplicates": self._duplicates[incident_id],
+            "fingerprint": self.fingerprint(key[0], key[1], entry["first_seen"]),
+        }
+
+    def _sweep(self, now: float, is_open: Callable[[str], bool]):
+        """Drop fingerprints whose window expired or whose incident is resolved"""
+        for key in [k for k, e in self._active.items()
+                    if now - e["last_seen"] > self.window_seconds or not is_open(e["incident_id"])]:
+            del self._active[key]
+        for service in [s for s, i in self._by_service.items() if not is_open(i)]:
+            self._duplicates.pop(self._by_service.pop(service), None)
+
+    def suppression_ratio(self) -> float:
+        """Share of failures folded into an existing incident"""
+        return self.stats["suppressed"] / self.stats["failures"] if self.stats["failures"] else 0.0
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self.stats,
+                "suppression_ratio": self.suppression_ratio(),
+                "window_seconds": self.window_seconds,
+                "active_fingerprints": [
+                    {"fingerprint": self.fingerprint(service, error_class, e["first_seen"]),
+                     "service": service, "error_class": error_class, **e}
+                    for (service, error_class), e in self._active.items()
+                ],
+            }
@@ -0,0 +1,244 @@
+# ------------------------------------------------------------
+#  incident_pipeline.py
+# ------------------------------------------------------------
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import tracing
+
+pipeline_logger = logging.getLogger('agentic_ai_pipeline')
+
+StageFunc = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+
+class StageStatus:
+    PENDING = "pending"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    TIMED_OUT = "timed_out"
+    SKIPPED = "skipped"
+    CANCELLED = "cancelled"
+
+
+class Stage:
+    """One node of the incident DAG"""
+
+    def __init__(self, name: str, func: StageFunc, depends_on: Optional[List[str]] = None,
+                 timeout: float = 30.0, retries: int = 0, retry_backoff: float = 0.5, critical: bool = True):
+        self.name = name
+        self.func = func
+        self.depends_on = list(depends_on or [])
+        self.timeout = timeout
+        self.retries = retries
+        self.retry_backoff = retry_backoff
+        # A non-critical stage may fail without skipping the stages that depend on it
+        self.critical = critical
+
+
+def new_stage_record(name: str) -> Dict[str, Any]:
+    return {"stage": name, "status": StageStatus.PENDING, "attempts": 0,
+            "started_at": None, "finished_at": None, "duration": None,
+            "result": None, "error": None}
+
+
+async def run_stage_attempts(stage: Stage, context: Dict[str, Any], record: Dict[str, Any],
+                             token: Any = None, pipeline_name: str = "pipeline"):
+    """Run one stage with its timeout and retries, updating `record` in place"""
+    with tracing.span(f"stage {stage.name}", {"pipeline.name": pipeline_name, "stage.name": stage.name,
+                                              "incident.id": context.get("incident_id")}):
+        record["status"] = StageStatus.RUNNING
+        record["started_at"] = time.time()
+        for attempt in range(stage.retries + 1):
+            record["attempts"] = attempt + 1
+            try:
+                value = await asyncio.wait_for(stage.func(context), timeout=stage.timeout)
+                record["status"] = StageStatus.SUCCEEDED
+                record["result"] = value
+                record["error"] = None
+                context["results"][stage.name] = value
+                break
+            except asyncio.TimeoutError:
+                record["status"] = StageStatus.TIMED_OUT
+                record["error"] = f"Timed out after {stage.timeout:.1f}s"
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if token and token.cancelled:
+                    raise asyncio.CancelledError() from e
+                record["status"] = StageStatus.FAILED
+                record["error"] = f"{type(e).__name__}: {e}"
+
+            pipeline_logger.warning(
+                f"⚠️ [PIPELINE {pipeline_name}] Stage '{stage.name}' attempt {attempt + 1} "
+                f"{record['status']}: {record['error']}")
+            if attempt < stage.retries:
+                await asyncio.sleep(stage.retry_backoff * (2 ** attempt))
+
+        tracing.set_attributes({"stage.status": record["status"], "stage.attempts": record["attempts"]})
+
+    record["finished_at"] = time.time()
+    record["duration"] = record["finished_at"] - record["started_at"]
+
+
+def build_run_result(pipeline_name: str, incident_id: Optional[str], stages: Dict[str, Stage],
+                     results: Dict[str, Dict[str, Any]], started: float, token: Any = None) -> Dict[str, Any]:
+    """Structured outcome of one incident run, shared by the asyncio DAG and the workflow engine"""
+    failed = [name for name, r in results.items()
+              if r["status"] != StageStatus.SUCCEEDED and stages[name].critical]
+    if token and token.cancelled:
+        status = StageStatus.CANCELLED
+    else:
+        status = StageStatus.FAILED if failed else StageStatus.SUCCEEDED
+    return {
+        "pipeline": pipeline_name,
+        "incident_id": incident_id,
+        "status": status,
+        "cancel_reason": token.reason if token and token.cancelled else None,
+        "failed_stages": failed,
+        "started_at": started,
+        "duration": time.time() - started,
+        "stages": results,
+    }
+
+
+class IncidentPipeline:
+    """Declarative DAG of async stages with per-stage timeouts and retries"""
+
+    def __init__(self, name: str, stages: List[Stage]):
+        self.name = name
+        self.stages = {stage.name: stage for stage in stages}
+        if len(self.stages) != len(stages):
+            raise ValueError(f"Duplicate stage names in pipeline '{name}'")
+        self.order = self._topological_order()
+
+    def _topological_order(self) -> List[str]:
+        for stage in self.stages.values():
+            for dep in stage.depends_on:
+                if dep not in self.stages:
+                    raise ValueError(f"Stage '{stage.name}' depends on unknown stage '{dep}'")
+
+        order, visiting, done = [], set(), set()
+
+        def visit(name: str):
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f"Cycle detected in pipeline '{self.name}' at stage '{name}'")
+            visiting.add(name)
+            for dep in self.stages[name].depends_on:
+                visit(dep)
+            visiting.discard(name)
+            done.add(name)
+            order.append(name)
+
+        for name in self.stages:
+            visit(name)
+        return order
+
+    async def run(self, context: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Run every stage as soon as its dependencies finish; return structured results.
+        A `cancel_token` in the context cancels running stages and skips the rest.
+        """
+        started = time.time()
+        token = context.get("cancel_token")
+        results: Dict[str, Dict[str, Any]] = {name: new_stage_record(name) for name in self.order}
+        context.setdefault("results", {})
+        done_events = {name: asyncio.Event() for name in self.order}
+
+        async def run_stage(stage: Stage):
+            record = results[stage.name]
+            try:
+                await attempt_stage(stage, record)
+            except asyncio.CancelledError:
+                if not (token and token.cancelled):
+                    raise
+                record["status"] = StageStatus.CANCELLED
+                record["error"] = f"Cancelled: {token.reason}"
+                if record["started_at"] is not None:
+                    record["finished_at"] = time.time()
+                    record["duration"] = record["finished_at"] - record["started_at"]
+                done_events[stage.name].set()
+
+        async def attempt_stage(stage: Stage, record: Dict[str, Any]):
+            for dep in stage.depends_on:
+                await done_events[dep].wait()
+
+            if token and token.cancelled:
+                raise asyncio.CancelledError()
+
+            blocked_by = [dep for dep in stage.depends_on
+                          if results[dep]["status"] != StageStatus.SUCCEEDED and self.stages[dep].critical]
+            if blocked_by:
+                record["status"] = StageStatus.SKIPPED
+                record["error"] = f"Upstream stage(s) did not succeed: {', '.join(blocked_by)}"
+                done_events[stage.name].set()
+                return
+
+            await run_stage_attempts(stage, context, record, token, pipeline_name=self.name)
+            done_events[stage.name].set()
+
+        tasks = [asyncio.ensure_future(run_stage(self.stages[name])) for name in self.order]
+        if token:
+            loop = asyncio.get_running_loop()
+
+            def cancel_tasks():
+                for task in tasks:
+                    task.cancel()
+
+            token.on_cancel(lambda: loop.call_soon_threadsafe(cancel_tasks))
+        await asyncio.gather(*tasks)
+
+        return build_run_result(self.name, context.get("incident_id"), self.stages, results, started, token)
+
+
+class PipelineRunner:
+    """
+    Single background event loop shared by all incident pipelines, so each
+    concurrent incident costs coroutines rather than OS threads. Blocking
+    model/webhook calls go through a bounded executor via `run_blocking`.
+    """
+
+    def __init__(self, max_blocking_workers: int = 16):
+        self.loop = asyncio.new_event_loop()
+        self.loop.set_default_executor(
+            ThreadPoolExecutor(max_workers=max_blocking_workers, thread_name_prefix="agent-call"))
+        self._thread = threading.Thread(target=self._run_loop, name="incident-pipelines", daemon=True)
+        self._thread.start()
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def submit(self, pipeline: IncidentPipeline, context: Dict[str, Any],
+               on_done: Optional[Callable[[Dict[str, Any]], None]] = None) -> Future:
+        """Schedule a pipeline run from any thread"""
+        run = tracing.traced(pipeline.run(context), f"pipeline {pipeline.name}",
+                             {"pipeline.name": pipeline.name, "incident.id": context.get("incident_id")},
+                             trigger=tracing.capture())
+        return self.run_coroutine(run, on_done)
+
+    def run_coroutine(self, coro: Awaitable[Dict[str, Any]],
+                      on_done: Optional[Callable[[Dict[str, Any]], None]] = None) -> Future:
+        """Schedule any coroutine on the shared loop; `on_done` gets its result on success"""
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        if on_done:
+            def _callback(f: Future):
+                if not f.cancelled() and f.exception() is None:
+                    on_done(f.result())
+            future.add_done_callback(_callback)
+        return future
+
+    @staticmethod
+    async def run_blocking(func: Callable, *args, **kwargs) -> Any:
+        """Run a blocking call on the bounded executor without stalling the loop"""
+        call = tracing.bind(func)  # executor threads continue the caller's trace
+        return await asyncio.get_running_loop().run_in_executor(None, lambda: call(*args, **kwargs))
+
+    def shutdown(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
@@ -0,0 +1,205 @@
+# ------------------------------------------------------------
+#  incident_registry.py
+# ------------------------------------------------------------
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from itertools import islice
+from datetime import datetime
+from enum import Enum
+from typing import Any, Callable, Dict, List, Optional
+
+
+class IncidentState(Enum):
+    DETECTED = "detected"
+    TRIAGING = "triaging"
+    FIXING = "fixing"
+    VERIFYING = "verifying"
+    ESCALATED = "escalated"
+    RESOLVED = "resolved"
+
+
+# Allowed state machine transitions; RESOLVED is terminal
+TRANSITIONS = {
+    IncidentState.DETECTED: {IncidentState.TRIAGING, IncidentState.ESCALATED, IncidentState.RESOLVED},
+    IncidentState.TRIAGING: {IncidentState.FIXING, IncidentState.ESCALATED, IncidentState.RESOLVED},
+    IncidentState.FIXING: {IncidentState.VERIFYING, IncidentState.ESCALATED, IncidentState.RESOLVED},
+    IncidentState.VERIFYING: {IncidentState.FIXING, IncidentState.ESCALATED, IncidentState.RESOLVED},
+    IncidentState.ESCALATED: {IncidentState.TRIAGING, IncidentState.RESOLVED},
+    IncidentState.RESOLVED: set(),
+}
+
+
+class InvalidTransition(ValueError):
+    """Raised when an incident is moved along an edge the state machine does not allow"""
+
+
+class IncidentRegistry:
+    """
+    Many concurrent incidents, each with its own state machine, indexed by
+    id, status and service. Every lookup and update is O(1); resolved
+    incidents are kept in a bounded history. `on_change` is called with the
+    incident after it is opened, updated or changes state (e.g. to persist it).
+    """
+
+    def __init__(self, max_history: int = 500, on_change: Optional[Callable[[Dict[str, Any]], None]] = None):
+        self.max_history = max_history
+        self.on_change = on_change
+        self._lock = threading.RLock()
+        self._by_id: Dict[str, Dict[str, Any]] = {}
+        self._by_status: Dict[IncidentState, Dict[str, None]] = {state: {} for state in IncidentState}
+        self._by_service: Dict[str, Dict[str, None]] = {}  # open incidents only
+        self._history: "OrderedDict[str, None]" = OrderedDict()  # resolved, oldest first
+        self.stats = {"opened": 0, "resolved": 0, "timed_resolutions": 0, "total_resolution_seconds": 0.0}
+
+    def open(self, service: str, incident_type: str, severity: str, description: str,
+             detected_by: str, **fields) -> Dict[str, Any]:
+        """Register a new incident in DETECTED state"""
+        incident_id = f"INC-{int(time.time())}-{uuid.uuid4().hex[:12]}"
+        incident = {
+            "id": incident_id,
+            "service": service,
+            "type": incident_type,
+            "start_time": datetime.now().isoformat(),
+            "started_at": time.time(),
+            "severity": severity,
+            "description": description,
+            "detected_by": detected_by,
+            "status": IncidentState.DETECTED.value,
+            "transitions": [{"status": IncidentState.DETECTED.value, "at": datetime.now().isoformat()}],
+            **fields
+        }
+        with self._lock:
+            self._by_id[incident_id] = incident
+            self._by_status[IncidentState.DETECTED][incident_id] = None
+            self._by_service.setdefault(service, {})[incident_id] = None
+            self.stats["opened"] += 1
+        if self.on_change:
+            self.on_change(incident)
+        return incident
+
+    def restore(self, incident: Dict[str, Any]) -> Dict[str, Any]:
+        """Re-register an incident persisted by a previous process, keeping its state"""
+        state = IncidentState(incident["status"])
+        with self._lock:
+            self._by_id[incident["id"]] = incident
+            self._by_status[state][incident["id"]] = None
+            if state != IncidentState.RESOLVED:
+                self._by_service.setdefault(incident["service"], {})[incident["id"]] = None
+            self.stats["opened"] += 1
+        return incident
+
+    def get(self, incident_id: str) -> Optional[Dict[str, Any]]:
+        return self._by_id.get(incident_id)
+
+    def update(self, incident_id: str, **fields) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            incident = self._by_id.get(incident_id)
+            if incident is not None:
+                incident.update(fields)
+        if incident is not None and self.on_change:
+            self.on_change(incident)
+        return incident
+
+    def transition(self, incident_id: str, new_state: IncidentState, **fields) -> Dict[str, Any]:
+        """Move an incident along its state machine"""
+        with self._lock:
+            incident = self._by_id.get(incident_id)
+            if incident is None:
+                raise KeyError(f"Unknown incident {incident_id}")
+            current = IncidentState(incident["status"])
+            if new_state == current:
+                incident.update(fields)
+                return incident
+            if new_state not in TRANSITIONS[current]:
+                raise InvalidTransition(f"{incident_id}: {current.value} -> {new_state.value} not allowed")
+
+            del self._by_status[current][incident_id]
+            self._by_status[new_state][incident_id] = None
+            incident["status"] = new_state.value
+            incident["transitions"].append({"status": new_state.value, "at": datetime.now().isoformat()})
+            incident.update(fields)
+
+            if new_state == IncidentState.RESOLVED:
+                self._on_resolved(incident)
+        if self.on_change:
+            self.on_change(incident)
+        return incident
+
+    def resolve(self, incident_id: str, resolution: str, **fields) -> Dict[str, Any]:
+        """Resolve an incident, recording its resolution time"""
+        incident = self.get(incident_id)
+        if incident is None:
+            raise KeyError(f"Unknown incident {incident_id}")
+        resolution_time = time.time() - incident["started_at"]
+        return self.transition(
+            incident_id,
+            IncidentState.RESOLVED,
+            resolved_time=datetime.now().isoformat(),
+            resolution_time_seconds=resolution_time,  # Store as number for calculations
+            resolution_time=f"{resolution_time:.1f}s",  # Store as string for display
+            resolution=resolution,
+            **fields
+        )
+
+    def _on_resolved(self, incident: Dict[str, Any]):
+        service_index = self._by_service.get(incident["service"], {})
+        service_index.pop(incident["id"], None)
+        if not service_index:
+            self._by_service.pop(incident["service"], None)
+
+        self.stats["resolved"] += 1
+        if incident.get("resolution_time_seconds") is not None:
+            self.stats["timed_resolutions"] += 1
+            self.stats["total_resolution_seconds"] += incident["resolution_time_seconds"]
+
+        self._history[incident["id"]] = None
+        while len(self._history) > self.max_history:
+            evicted, _ = self._history.popitem(last=False)
+            self._by_status[IncidentState.RESOLVED].pop(evicted, None)
+            self._by_id.pop(evicted, None)
+
+    def is_open(self, incident_id: str) -> bool:
+        incident = self.get(incident_id)
+        return incident is not None and incident["status"] != IncidentState.RESOLVED.value
+
+    def open_for_service(self, service: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [self._by_id[i] for i in self._by_service.get(service, {})]
+
+    def by_status(self, state: IncidentState) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [self._by_id[i] for i in self._by_status[state]]
+
+    def open_incidents(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [self._by_id[i] for state, ids in self._by_status.items()
+                    if state != IncidentState.RESOLVED for i in ids]
+
+    def open_count(self) -> int:
+        with self._lock:
+            return sum(len(ids) for state, ids in self._by_status.items() if state != IncidentState.RESOLVED)
+
+    def latest_open(self) -> Optional[Dict[str, Any]]:
+        """Most recently opened incident that is still open"""
+        open_incidents = self.open_incidents()
+        return max(open_incidents, key=lambda i: i["started_at"]) if open_incidents else None
+
+    def history(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """Most recent resolved incidents, oldest first"""
+        with self._lock:
+            ids = list(islice(reversed(self._history), limit))[::-1] if limit > 0 else []
+            return [self._by_id[i] for i in ids]
+
+    def total_incidents(self) -> int:
+        return self.stats["opened"]
+
+    def avg_resolution_time(self) -> float:
+        return self.stats["total_resolution_seconds"] / max(self.stats["timed_resolutions"], 1)
+
+    def success_rate(self) -> float:
+        """Share of finished incidents that were resolved rather than left escalated"""
+        escalated = len(self._by_status[IncidentState.ESCALATED])
+        finished = self.stats["resolved"] + escalated
+        return (self.stats["resolved"] / finished) * 100 if finished else 100.0
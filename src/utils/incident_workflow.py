@@ -0,0 +1,255 @@
+# ------------------------------------------------------------
+#  incident_workflow.py
+# ------------------------------------------------------------
+import asyncio
+import json
+import os
+import shutil
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional
+
+import tracing
+from incident_pipeline import (IncidentPipeline, PipelineRunner, Stage, StageStatus, build_run_result,
+                               new_stage_record, pipeline_logger, run_stage_attempts)
+
+# Microsoft Agent Framework workflows (fan-out/fan-in executors + checkpointing)
+try:
+    from agent_framework import (Executor, FileCheckpointStorage, WorkflowBuilder, WorkflowContext,
+                                 WorkflowOutputEvent, handler)
+    WORKFLOWS_AVAILABLE = True
+except ImportError:
+    WORKFLOWS_AVAILABLE = False
+
+# Per incident: <checkpoint_dir>/<incident_id>/incident.json plus a checkpoints/ dir owned by FileCheckpointStorage
+INCIDENT_FILE = "incident.json"
+CHECKPOINTS_SUBDIR = "checkpoints"
+
+# Runs cancelled for this reason keep their checkpoints so the next process resumes them
+SHUTDOWN_REASON = "shutdown"
+
+
+class _RunState:
+    """Per-incident bookkeeping shared by the executors of one workflow run"""
+
+    def __init__(self, incident_id: str, token: Any):
+        self.incident_id = incident_id
+        self.token = token
+        self.live: Dict[str, Dict[str, Any]] = {}  # stage records started in this process
+        self.tasks = set()
+
+
+if WORKFLOWS_AVAILABLE:
+    class StageExecutor(Executor):
+        """Workflow executor running one incident `Stage` with its timeout and retries"""
+
+        def __init__(self, stage: Stage, graph: IncidentPipeline, state: _RunState, terminal: bool,
+                     on_stage_done: Callable[[str], None]):
+            super().__init__(id=stage.name)
+            self.stage = stage
+            self.graph = graph
+            self.state = state
+            self.terminal = terminal
+            self.on_stage_done = on_stage_done
+
+        @handler
+        async def handle_upstream(self, message: dict, ctx: WorkflowContext[dict, dict]) -> None:
+            await self._execute(message["incident_id"], dict(message["stages"]), ctx)
+
+        @handler
+        async def handle_fan_in(self, messages: list[dict], ctx: WorkflowContext[dict, dict]) -> None:
+            records: Dict[str, Dict[str, Any]] = {}
+            for message in messages:
+                records.update(message["stages"])
+            await self._execute(messages[0]["incident_id"], records, ctx)
+
+        async def _execute(self, incident_id: str, records: Dict[str, Dict[str, Any]],
+                           ctx: WorkflowContext[dict, dict]):
+            record = new_stage_record(self.stage.name)
+            self.state.live[self.stage.name] = record
+            blocked_by = [dep for dep in self.stage.depends_on
+                          if records.get(dep, {}).get("status") != StageStatus.SUCCEEDED
+                          and self.graph.stages[dep].critical]
+            if self.state.token and self.state.token.cancelled:
+                raise asyncio.CancelledError()
+
+            if blocked_by:
+                record["status"] = StageStatus.SKIPPED
+                record["error"] = f"Upstream stage(s) did not succeed: {', '.join(blocked_by)}"
+            else:
+                context = {
+                    "incident_id": incident_id,
+                    "results": {name: r["result"] for name, r in records.items()
+                                if r["status"] == StageStatus.SUCCEEDED},
+                }
+                task = asyncio.ensure_future(
+                    run_stage_attempts(self.stage, context, record, self.state.token, self.graph.name))
+                self.state.tasks.add(task)
+                try:
+                    await task
+                finally:
+                    self.state.tasks.discard(task)
+
+            records[self.stage.name] = record
+            self.on_stage_done(incident_id)
+
+            message = {"incident_id": incident_id, "stages": records}
+            if self.terminal:
+                await ctx.yield_output(message)
+            else:
+                await ctx.send_message(message)
+
+
+class IncidentWorkflowRunner:
+    """
+    Runs the incident stages as an Agent Framework workflow: the DAG becomes
+    executors joined by fan-out/fan-in edges, and every superstep is
+    checkpointed to disk per incident. After a restart, `resume_pending`
+    restores each unfinished incident from its latest checkpoint so stages
+    that already completed are not run (or billed) again.
+    """
+
+    def __init__(self, name: str, stages: List[Stage], runner: PipelineRunner, checkpoint_dir: str,
+                 snapshot: Optional[Callable[[str], Optional[Dict[str, Any]]]] = None):
+        if not WORKFLOWS_AVAILABLE:
+            raise RuntimeError("agent_framework workflows are not installed")
+        self.graph = IncidentPipeline(name, stages)  # validates dependencies and cycles
+        self.runner = runner
+        self.checkpoint_dir = checkpoint_dir
+        self.snapshot = snapshot
+        roots = [s for s in self.graph.stages.values() if not s.depends_on]
+        sinks = [n for n in self.graph.order if not any(n in s.depends_on for s in self.graph.stages.values())]
+        if len(roots) != 1 or len(sinks) != 1:
+            raise ValueError(f"Workflow '{name}' needs exactly one start and one final stage")
+        self.start, self.final = roots[0].name, sinks[0]
+
+    def _incident_dir(self, incident_id: str) -> str:
+        return os.path.join(self.checkpoint_dir, incident_id)
+
+    def _storage(self, incident_id: str) -> "FileCheckpointStorage":
+        return FileCheckpointStorage(os.path.join(self._incident_dir(incident_id), CHECKPOINTS_SUBDIR))
+
+    def _build(self, state: _RunState, storage: "FileCheckpointStorage"):
+        executors = {
+            name: StageExecutor(stage, self.graph, state, name == self.final, self._persist_incident)
+            for name, stage in self.graph.stages.items()
+        }
+        builder = WorkflowBuilder().set_start_executor(executors[self.start])
+
+        # Single-dependency successors of a stage fan out from it; multi-dependency stages fan in
+        for name in self.graph.order:
+            successors = [s for s in self.graph.order
+                          if self.graph.stages[s].depends_on == [name]]
+            if len(successors) > 1:
+                builder.add_fan_out_edges(executors[name], [executors[s] for s in successors])
+            elif successors:
+                builder.add_edge(executors[name], executors[successors[0]])
+            deps = self.graph.stages[name].depends_on
+            if len(deps) > 1:
+                builder.add_fan_in_edges([executors[d] for d in deps], executors[name])
+
+        return builder.with_checkpointing(storage).build()
+
+    def _persist_incident(self, incident_id: str):
+        """Keep the incident snapshot next to its checkpoints so a restart can re-register it"""
+        incident = self.snapshot(incident_id) if self.snapshot else None
+        if incident is None:
+            return
+        path = os.path.join(self._incident_dir(incident_id), INCIDENT_FILE)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(incident, f, default=str)
+        os.replace(tmp_path, path)
+
+    def submit(self, incident_id: str, token: Any = None,
+               on_done: Optional[Callable[[Dict[str, Any]], None]] = None) -> Future:
+        """Start a new incident workflow from any thread"""
+        self._persist_incident(incident_id)
+        message = {"incident_id": incident_id, "stages": {}}
+        run = tracing.traced(self._run(incident_id, token, message=message), f"workflow {self.graph.name}",
+                             {"pipeline.name": self.graph.name, "incident.id": incident_id},
+                             trigger=tracing.capture())
+        return self.runner.run_coroutine(run, on_done)
+
+    def resume_pending(self, restore: Callable[[Dict[str, Any]], Any],
+                       on_done: Optional[Callable[[Dict[str, Any]], None]] = None) -> List[str]:
+        """Resume every incident left with checkpoints; `restore` re-registers it and returns its token"""
+        if not os.path.isdir(self.checkpoint_dir):
+            return []
+        resumed = []
+        for incident_id in sorted(os.listdir(self.checkpoint_dir)):
+            path = os.path.join(self._incident_dir(incident_id), INCIDENT_FILE)
+            if not os.path.isfile(path):
+                continue
+            with open(path) as f:
+                incident = json.load(f)
+            token = restore(incident)
+            run = tracing.traced(self._resume(incident_id, token), f"workflow {self.graph.name}",
+                                 {"pipeline.name": self.graph.name, "incident.id": incident_id, "workflow.resumed": True})
+            self.runner.run_coroutine(run, on_done)
+            resumed.append(incident_id)
+        return resumed
+
+    async def _resume(self, incident_id: str, token: Any) -> Dict[str, Any]:
+        storage = self._storage(incident_id)
+        checkpoints = await storage.list_checkpoints()
+        if not checkpoints:
+            return await self._run(incident_id, token, message={"incident_id": incident_id, "stages": {}})
+        latest = max(checkpoints, key=lambda c: (c.iteration_count, c.timestamp))
+        pipeline_logger.info(f"♻️ [WORKFLOW {self.graph.name}] Resuming {incident_id} from checkpoint "
+                             f"{latest.checkpoint_id} (superstep {latest.iteration_count})")
+        return await self._run(incident_id, token, checkpoint_id=latest.checkpoint_id)
+
+    async def _run(self, incident_id: str, token: Any, message: Optional[Dict[str, Any]] = None,
+                   checkpoint_id: Optional[str] = None) -> Dict[str, Any]:
+        state = _RunState(incident_id, token)
+        storage = self._storage(incident_id)
+        workflow = self._build(state, storage)
+        started = time.time()
+
+        if token:
+            loop = asyncio.get_running_loop()
+            run_task = asyncio.current_task()
+
+            def cancel_run():
+                run_task.cancel()
+                for task in list(state.tasks):
+                    task.cancel()
+
+            token.on_cancel(lambda: loop.call_soon_threadsafe(cancel_run))
+
+        output = None
+        try:
+            if checkpoint_id:
+                stream = workflow.run_stream(checkpoint_id=checkpoint_id, checkpoint_storage=storage)
+            else:
+                stream = workflow.run_stream(message)
+            async for event in stream:
+                if isinstance(event, WorkflowOutputEvent):
+                    output = event.data
+        except asyncio.CancelledError:
+            if not (token and token.cancelled):
+                raise
+        except Exception as e:
+            pipeline_logger.error(f"⚠️ [WORKFLOW {self.graph.name}] {incident_id} failed: {type(e).__name__}: {e}")
+
+        records = output["stages"] if output else state.live
+        results = {}
+        for name in self.graph.order:
+            record = records.get(name) or new_stage_record(name)
+            if record["status"] in (StageStatus.PENDING, StageStatus.RUNNING) and token and token.cancelled:
+                record["status"] = StageStatus.CANCELLED
+                record["error"] = f"Cancelled: {token.reason}"
+            results[name] = record
+
+        result = build_run_result(self.graph.name, incident_id, self.graph.stages, results, started, token)
+        result["engine"] = "agent_framework_workflow"
+        result["resumed_from_checkpoint"] = checkpoint_id
+        if token and token.cancelled and token.reason == SHUTDOWN_REASON:
+            result["checkpoints_kept"] = True
+            pipeline_logger.info(f"💾 [WORKFLOW {self.graph.name}] {incident_id} interrupted by shutdown; "
+                                 f"checkpoints kept for resume")
+        else:
+            shutil.rmtree(self._incident_dir(incident_id), ignore_errors=True)
+        return result
@@ -0,0 +1,149 @@
+# ------------------------------------------------------------
+#  latency_sketch.py
+# ------------------------------------------------------------
+import math
+import threading
+from typing import Any, Dict, List, Optional
+
+QUANTILES = {"p50": 0.50, "p95": 0.95, "p99": 0.99, "p999": 0.999}
+
+
+class QuantileSketch:
+    """
+    Mergeable streaming quantile sketch with logarithmic buckets (the
+    DDSketch / HDR-histogram idea): every quantile is within
+    `relative_accuracy` of the true value, and memory is bounded by
+    `max_buckets` whatever the number of samples. Sketches with the same
+    accuracy merge by adding bucket counts.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01, min_value: float = 1e-6, max_buckets: int = 2048):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.min_value = min_value  # values below this are counted as zero
+        self.max_buckets = max_buckets
+        self.buckets: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float):
+        self.count += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        if value < self.min_value:
+            self.zero_count += 1
+            return
+        index = math.ceil(math.log(value) / self._log_gamma)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        if len(self.buckets) > self.max_buckets:
+            self._collapse()
+
+    def _collapse(self):
+        """Fold the lowest buckets together; only the smallest quantiles lose accuracy"""
+        lowest = sorted(self.buckets)[:len(self.buckets) - self.max_buckets + 1]
+        target = lowest[-1]
+        for index in lowest[:-1]:
+            self.buckets[target] += self.buckets.pop(index)
+
+    def merge(self, other: "QuantileSketch"):
+        if other.gamma != self.gamma:
+            raise ValueError("Cannot merge sketches with different relative accuracy")
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        while len(self.buckets) > self.max_buckets:
+            self._collapse()
+
+    def quantiles(self, qs: Dict[str, float]) -> Dict[str, Optional[float]]:
+        """Several quantiles in one pass over the sorted buckets"""
+        if not self.count:
+            return {name: None for name in qs}
+        ranked = sorted(qs.items(), key=lambda item: item[1])
+        results: Dict[str, Optional[float]] = {}
+        cumulative = self.zero_count
+        position = 0
+        while position < len(ranked) and cumulative > ranked[position][1] * (self.count - 1):
+            results[ranked[position][0]] = 0.0
+            position += 1
+        for index in sorted(self.buckets):
+            cumulative += self.buckets[index]
+            while position < len(ranked) and cumulative > ranked[position][1] * (self.count - 1):
+                estimate = 2 * self.gamma ** index / (self.gamma + 1)
+                results[ranked[position][0]] = min(max(estimate, self.min), self.max)
+                position += 1
+        for name, _ in ranked[position:]:
+            results[name] = self.max
+        return results
+
+    def cumulative_counts(self, bounds: List[float]) -> List[int]:
+        """Samples at or below each ascending bound, e.g. for exposition histogram buckets"""
+        counts, cumulative, position = [], self.zero_count, 0
+        for index in sorted(self.buckets):
+            estimate = 2 * self.gamma ** index / (self.gamma + 1)
+            while position < len(bounds) and estimate > bounds[position]:
+                counts.append(cumulative)
+                position += 1
+            cumulative += self.buckets[index]
+        counts.extend([cumulative] * (len(bounds) - position))
+        return counts
+
+    def quantile(self, q: float) -> Optional[float]:
+        return self.quantiles({"q": q})["q"]
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "mean": self.sum / self.count if self.count else None,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+            **self.quantiles(QUANTILES),
+        }
+
+
+class SketchRegistry:
+    """Thread-safe sketches keyed by (kind, key), e.g. ("endpoint", "/api/search") or ("model", "gpt-4o")"""
+
+    def __init__(self, relative_accuracy: float = 0.01):
+        self.relative_accuracy = relative_accuracy
+        self._sketches: Dict[str, Dict[str, QuantileSketch]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, kind: str, key: str, value: float):
+        with self._lock:
+            by_key = self._sketches.setdefault(kind, {})
+            sketch = by_key.get(key)
+            if sketch is None:
+                sketch = by_key[key] = QuantileSketch(self.relative_accuracy)
+            sketch.add(value)
+
+    def snapshot(self, kind: Optional[str] = None, key: Optional[str] = None) -> Dict[str, Any]:
+        """Percentiles per key for one kind (or all kinds), plus an `_all` merge per kind"""
+        with self._lock:
+            kinds = [kind] if kind else list(self._sketches)
+            result = {}
+            for k in kinds:
+                by_key = self._sketches.get(k, {})
+                if key is not None:
+                    result[k] = {key: by_key[key].snapshot()} if key in by_key else {}
+                    continue
+                merged = QuantileSketch(self.relative_accuracy)
+                for sketch in by_key.values():
+                    merged.merge(sketch)
+                result[k] = {name: sketch.snapshot() for name, sketch in by_key.items()}
+                result[k]["_all"] = merged.snapshot()
+            return result
+
+    def histograms(self, kind: str, bounds: List[float]) -> Dict[str, Dict[str, Any]]:
+        """Cumulative bucket counts, count and sum per key; cost is bounded by the sketch size, not sample count"""
+        with self._lock:
+            return {key: {"buckets": sketch.cumulative_counts(bounds), "count": sketch.count, "sum": sketch.sum}
+                    for key, sketch in self._sketches.get(kind, {}).items()}
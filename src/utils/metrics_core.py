@@ -0,0 +1,96 @@
+# ------------------------------------------------------------
+#  metrics_core.py
+# ------------------------------------------------------------
+import threading
+import weakref
+from collections import deque
+from typing import Any, Dict, Iterable, List, Optional
+
+
+class _ShardOwner:
+    """Lives in a thread's local storage; collected when the thread exits"""
+
+    __slots__ = ("__weakref__",)
+
+
+class ShardedCounter:
+    """
+    Named counters sharded per thread. Each thread only ever writes its own
+    shard, so increments take no lock and are never lost; reads merge all
+    shards. When a thread exits, its shard is folded into a retired total,
+    so totals stay exact with short-lived request threads.
+    """
+
+    def __init__(self, keys: Iterable[str] = ()):
+        self._keys = list(keys)  # always reported, even at zero
+        self._local = threading.local()
+        self._shards: List[Dict[str, float]] = []
+        self._retired: Dict[str, float] = {}
+        self._lock = threading.Lock()  # taken once per thread and on merge, never per increment
+
+    def _shard(self) -> Dict[str, float]:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = {}
+            owner = _ShardOwner()
+            self._local.shard, self._local.owner = shard, owner
+            with self._lock:
+                self._shards.append(shard)
+            weakref.finalize(owner, self._retire, shard)
+        return shard
+
+    def _retire(self, shard: Dict[str, float]):
+        with self._lock:
+            for key, value in shard.items():
+                self._retired[key] = self._retired.get(key, 0) + value
+            self._shards.remove(shard)
+
+    def add(self, key: str, amount: float = 1):
+        shard = self._shard()
+        shard[key] = shard.get(key, 0) + amount
+
+    def get(self, key: str) -> float:
+        with self._lock:
+            return self._retired.get(key, 0) + sum(shard.get(key, 0) for shard in self._shards)
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            totals = dict.fromkeys(self._keys, 0)
+            for source in [self._retired] + [shard.copy() for shard in self._shards]:
+                for key, value in source.items():
+                    totals[key] = totals.get(key, 0) + value
+            return totals
+
+    def shard_count(self) -> int:
+        return len(self._shards)
+
+
+class AppendBuffer:
+    """
+    Bounded append-only buffer. deque.append is atomic, so writers never
+    lock; readers take a consistent copy, retrying if an append lands mid-copy.
+    """
+
+    def __init__(self, maxlen: Optional[int] = None):
+        self._items: deque = deque(maxlen=maxlen)
+        self.appended = ShardedCounter()
+
+    def append(self, item: Any):
+        self._items.append(item)
+        self.appended.add("items")
+
+    def snapshot(self, last: Optional[int] = None) -> List[Any]:
+        while True:
+            try:
+                items = list(self._items.copy())
+                break
+            except RuntimeError:  # deque mutated during copy
+                continue
+        return items[-last:] if last else items
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def total(self) -> int:
+        """Items ever appended, including those evicted from the buffer"""
+        return int(self.appended.get("items"))
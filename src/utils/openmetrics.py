@@ -0,0 +1,74 @@
+# ------------------------------------------------------------
+#  openmetrics.py
+# ------------------------------------------------------------
+import math
+from typing import Any, Dict, List, Optional, Tuple
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+# Latency bucket bounds in seconds (+Inf is added when rendering)
+LATENCY_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0]
+
+Labels = Dict[str, str]
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(labels: Optional[Labels]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def _number(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, bool):
+        return str(int(value))
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class OpenMetricsWriter:
+    """Builds one OpenMetrics text exposition; each family is written once with all its samples"""
+
+    def __init__(self, prefix: str = ""):
+        self.prefix = prefix
+        self._lines: List[str] = []
+
+    def _family(self, name: str, kind: str, help_text: str, unit: Optional[str] = None) -> str:
+        name = self.prefix + name
+        self._lines.append(f"# TYPE {name} {kind}")
+        if unit:
+            self._lines.append(f"# UNIT {name} {unit}")
+        self._lines.append(f"# HELP {name} {_escape(help_text)}")
+        return name
+
+    def counter(self, name: str, help_text: str, samples: List[Tuple[Labels, float]], unit: Optional[str] = None):
+        family = self._family(name, "counter", help_text, unit)
+        for labels, value in samples:
+            self._lines.append(f"{family}_total{_labels(labels)} {_number(value)}")
+
+    def gauge(self, name: str, help_text: str, samples: List[Tuple[Labels, float]], unit: Optional[str] = None):
+        family = self._family(name, "gauge", help_text, unit)
+        for labels, value in samples:
+            if value is not None:
+                self._lines.append(f"{family}{_labels(labels)} {_number(value)}")
+
+    def histogram(self, name: str, help_text: str, label_name: str, histograms: Dict[str, Dict[str, Any]],
+                  bounds: List[float], unit: Optional[str] = "seconds"):
+        """`histograms` maps a label value to cumulative `buckets` (one per bound), `count` and `sum`"""
+        family = self._family(name, "histogram", help_text, unit)
+        for key, hist in sorted(histograms.items()):
+            labels = {label_name: key}
+            for bound, count in zip(bounds, hist["buckets"]):
+                self._lines.append(f"{family}_bucket{_labels({**labels, 'le': repr(float(bound))})} {count}")
+            self._lines.append(f"{family}_bucket{_labels({**labels, 'le': '+Inf'})} {hist['count']}")
+            self._lines.append(f"{family}_count{_labels(labels)} {hist['count']}")
+            self._lines.append(f"{family}_sum{_labels(labels)} {_number(hist['sum'])}")
+
+    def render(self) -> str:
+        return "\n".join(self._lines + ["# EOF"]) + "\n"
@@ -11,6 +11,9 @@ from openai import AzureOpenAI, APIError, RateLimitError
 import base64
 import requests  # For fetching image URLs
 
+from usage_accounting import UsageLedger
+from deadlines import deadline, timeout_for
+
 
 # ------------------------------------------------------------
 # 1. Load environment variables
@@ -25,6 +28,14 @@ client = AzureOpenAI(
 
 ROUTER_DEPLOYMENT = "model-router"
 
+# Time budgets (seconds): whole routed request, single model call, image download
+ROUTER_DEADLINE_SECONDS = float(os.getenv("ROUTER_DEADLINE_SECONDS", "60"))
+MODEL_CALL_TIMEOUT = float(os.getenv("MODEL_CALL_TIMEOUT", "30"))
+HTTP_FETCH_TIMEOUT = float(os.getenv("HTTP_FETCH_TIMEOUT", "10"))
+
+# Token / cost accounting from the `usage` block of every response
+usage_ledger = UsageLedger()
+
 # ------------------------------------------------------------
 # 2. Prompts that exercise different model strengths
 # ------------------------------------------------------------
@@ -72,6 +83,7 @@ def call_router(messages: List[Dict[str, str]]) -> None:
         response = client.chat.completions.create(
             model=ROUTER_DEPLOYMENT,
             messages=messages,
+            timeout=timeout_for(MODEL_CALL_TIMEOUT, "router call"),
             max_tokens=4096,
             temperature=0.7,
             top_p=0.95,
@@ -80,12 +92,13 @@ def call_router(messages: List[Dict[str, str]]) -> None:
         choice = response.choices[0]
         content = choice.message.content.strip()
         routed_model = getattr(choice.message, "model", response.model)  # router injects it here
-        usage = response.usage
+        entry = usage_ledger.record("router", ROUTER_DEPLOYMENT, response.usage)
 
         print("\n" + "=" * 80)
         print(f"Prompt: {messages[-1]['content'][:70]}...")
         print(f"Routed model: {routed_model}")
-        print(f"Tokens → prompt: {usage.prompt_tokens} | completion: {usage.completion_tokens} | total: {usage.total_tokens}")
+        print(f"Tokens → prompt: {entry['prompt_tokens']} (cached: {entry['cached_tokens']}) | "
+              f"completion: {entry['completion_tokens']} | total: {entry['total_tokens']} | cost: ${entry['cost_usd']:.6f}")
         print("-" * 80)
         print(f"Answer:\n{content}")
         print("=" * 80 + "\n")
@@ -144,9 +157,12 @@ def transcribe_audio(audio_file_path: str) -> str:
             transcript = client_audio.audio.transcriptions.create(
                 model=DEPLOYMENTS["whisper"],
                 file=audio_file,
-                response_format="text"  # Or "json" for structured output
+                timeout=timeout_for(MODEL_CALL_TIMEOUT, "transcription"),
+                response_format="json"  # "json" carries the usage block; "text" does not
             )
-        return transcript
+        if getattr(transcript, "usage", None) is not None:
+            usage_ledger.record("speech", DEPLOYMENTS["whisper"], transcript.usage)
+        return transcript.text
     except Exception as e:
         return f"Transcription error: {str(e)}"
 
@@ -161,7 +177,8 @@ def extract_image_text(image_url_or_path: str, is_url: bool = True) -> str:
     # Encode image to base64
     if is_url:
         # Fetch image from URL
-        response = requests.get(image_url_or_path)
+        response = requests.get(image_url_or_path, timeout=timeout_for(HTTP_FETCH_TIMEOUT, "image download"))
+        response.raise_for_status()
         image_data = base64.b64encode(response.content).decode('utf-8')
         print(f"image_data:: {image_data}")
         mime_type = response.headers.get('content-type', 'image/jpeg')
@@ -192,19 +209,27 @@ def extract_image_text(image_url_or_path: str, is_url: bool = True) -> str:
     response = client_custom.chat.completions.create(
         model=DEPLOYMENTS["image"],  # Must be vision-capable like gpt-4o
         messages=messages,
+        timeout=timeout_for(MODEL_CALL_TIMEOUT, "image extraction"),
         max_tokens=1000,
         temperature=0.3  # Low for accurate extraction
     )
+    usage_ledger.record("image", DEPLOYMENTS["image"], response.usage)
 
     return response.choices[0].message.content.strip()
 
 
-def custom_router(messages: List[Dict]) -> Dict:
+def custom_router(messages: List[Dict], deadline_seconds: float = ROUTER_DEADLINE_SECONDS) -> Dict:
     """
     Enhanced router: Handles text, audio, or image inputs.
     - Detects special formats: [AUDIO: path] or [IMAGE: url/path]
     - For media, bypasses text routing and calls dedicated functions.
+    - Every downstream call gets the remaining `deadline_seconds` budget as its timeout.
     """
+    with deadline(deadline_seconds):
+        return _route_with_budget(messages)
+
+
+def _route_with_budget(messages: List[Dict]) -> Dict:
     user_content = messages[-1]["content"]
 
     # Check for audio
@@ -234,9 +259,11 @@ def custom_router(messages: List[Dict]) -> Dict:
     response = client_custom.chat.completions.create(
         model=selected_model,
         messages=messages,
+        timeout=timeout_for(MODEL_CALL_TIMEOUT, "routed completion"),
         temperature=0.7,
         top_p=0.95
     )
+    usage_ledger.record("custom_router", selected_model, response.usage)
     return {
         "content": response.choices[0].message.content,
         "selected_model": selected_model,
@@ -290,3 +317,9 @@ if __name__ == "__main__":
         print(f"Reason: {result['reason']}")
         print(f"Response: {result['content']}")
         print("-" * 80)
+
+    totals = usage_ledger.snapshot()["totals"]
+    print(f"\nTotal usage: {totals['total_tokens']} tokens "
+          f"({totals['cached_tokens']} cached) across {totals['calls']} calls - ${totals['cost_usd']:.6f}")
+    for model, model_usage in usage_ledger.snapshot()["by_model"].items():
+        print(f"  {model}: {model_usage['total_tokens']} tokens, ${model_usage['cost_usd']:.6f}")
@@ -0,0 +1,150 @@
+# ------------------------------------------------------------
+#  rollups.py
+# ------------------------------------------------------------
+import math
+import threading
+import time
+from array import array
+from typing import Any, Dict, List, Optional
+
+# (name, bucket width in seconds, buckets kept): 1 hour of seconds, 1 day of minutes, 30 days of hours
+RESOLUTIONS = (("second", 1, 3600), ("minute", 60, 1440), ("hour", 3600, 720))
+MAX_SCAN_BUCKETS = 120  # a window query never touches more buckets than this
+
+
+class _Ring:
+    """Fixed ring of buckets at one resolution, stored in compact typed arrays"""
+
+    __slots__ = ("name", "width", "slots", "epochs", "counts", "sums")
+
+    def __init__(self, name: str, width: int, slots: int):
+        self.name = name
+        self.width = width
+        self.slots = slots
+        self.epochs = array('q', [-1]) * slots  # bucket number (monotonic seconds // width) held in each slot
+        self.counts = array('q', [0]) * slots
+        self.sums = array('d', [0.0]) * slots
+
+    def add(self, now: float, value: float):
+        epoch = int(now // self.width)
+        i = epoch % self.slots
+        if self.epochs[i] != epoch:
+            self.epochs[i] = epoch
+            self.counts[i] = 0
+            self.sums[i] = 0.0
+        self.counts[i] += 1
+        self.sums[i] += value
+
+    def bucket(self, epoch: int):
+        i = epoch % self.slots
+        if self.epochs[i] != epoch:
+            return 0, 0.0
+        return self.counts[i], self.sums[i]
+
+    def window(self, now: float, seconds: float):
+        """Count and sum over the last `seconds`; the oldest bucket is pro-rated"""
+        start = now - seconds
+        first, last = int(start // self.width), int(now // self.width)
+        count, total = 0.0, 0.0
+        for epoch in range(first, last + 1):
+            c, s = self.bucket(epoch)
+            if epoch == first and first != last:
+                fraction = ((first + 1) * self.width - start) / self.width
+                c, s = c * fraction, s * fraction
+            count += c
+            total += s
+        return count, total
+
+
+class RollupSeries:
+    """Event count and value sum for one metric at second, minute and hour resolution"""
+
+    def __init__(self):
+        self.rings = [_Ring(name, width, slots) for name, width, slots in RESOLUTIONS]
+        self.total_count = 0
+        self.total_sum = 0.0
+
+    def add(self, value: float = 1.0, now: Optional[float] = None):
+        now = time.monotonic() if now is None else now
+        for ring in self.rings:
+            ring.add(now, value)
+        self.total_count += 1
+        self.total_sum += value
+
+    def ring_for(self, seconds: float, resolution: Optional[str] = None) -> _Ring:
+        """Requested resolution, else the finest one that covers the window in few buckets"""
+        if resolution:
+            for ring in self.rings:
+                if ring.name == resolution:
+                    return ring
+            raise ValueError(f"Unknown resolution '{resolution}'")
+        for ring in self.rings:
+            if seconds <= ring.width * min(ring.slots, MAX_SCAN_BUCKETS):
+                return ring
+        return self.rings[-1]
+
+    def window(self, seconds: float, now: Optional[float] = None) -> Dict[str, Any]:
+        now = time.monotonic() if now is None else now
+        ring = self.ring_for(seconds)
+        seconds = min(seconds, ring.width * ring.slots)
+        count, total = ring.window(now, seconds)
+        return {
+            "window_seconds": seconds,
+            "resolution": ring.name,
+            "count": round(count),
+            "sum": total,
+            "rate_per_second": count / seconds if seconds else 0.0,
+        }
+
+    def buckets(self, seconds: float, resolution: Optional[str] = None,
+                now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Per-bucket counts/sums for charting, oldest first; `age_seconds` is relative to now"""
+        now = time.monotonic() if now is None else now
+        ring = self.ring_for(seconds, resolution)
+        last = int(now // ring.width)
+        n = min(math.ceil(seconds / ring.width), ring.slots)
+        points = []
+        for epoch in range(last - n + 1, last + 1):
+            count, total = ring.bucket(epoch)
+            points.append({"age_seconds": now - epoch * ring.width, "count": count, "sum": total})
+        return points
+
+
+class Rollups:
+    """Thread-safe registry of named rollup series"""
+
+    def __init__(self):
+        self._series: Dict[str, RollupSeries] = {}
+        self._lock = threading.Lock()
+
+    def add(self, name: str, value: float = 1.0):
+        now = time.monotonic()
+        with self._lock:
+            series = self._series.get(name)
+            if series is None:
+                series = self._series[name] = RollupSeries()
+            series.add(value, now)
+
+    def count(self, name: str, seconds: float) -> int:
+        return self.window(name, seconds)["count"]
+
+    def window(self, name: str, seconds: float) -> Dict[str, Any]:
+        with self._lock:
+            series = self._series.get(name)
+            if series is None:
+                return {"window_seconds": seconds, "resolution": None, "count": 0, "sum": 0.0,
+                        "rate_per_second": 0.0}
+            return series.window(seconds)
+
+    def buckets(self, name: str, seconds: float, resolution: Optional[str] = None) -> List[Dict[str, Any]]:
+        with self._lock:
+            series = self._series.get(name)
+            return series.buckets(seconds, resolution) if series else []
+
+    def names(self) -> List[str]:
+        with self._lock:
+            return sorted(self._series)
+
+    def totals(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {name: {"count": s.total_count, "sum": s.total_sum} for name, s in self._series.items()}
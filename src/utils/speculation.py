@@ -0,0 +1,112 @@
+# ------------------------------------------------------------
+#  speculation.py
+# ------------------------------------------------------------
+import asyncio
+import logging
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from cancellation import CancellationToken
+from incident_pipeline import PipelineRunner
+from timer_wheel import TimerWheel
+
+speculation_logger = logging.getLogger('agentic_ai_speculation')
+
+
+class SpeculativeRuns:
+    """
+    Background work started on a soft signal (e.g. a degradation alarm) and
+    kept warm for a while. If the hard signal follows, the owner claims the
+    run and reuses its result; if the signal clears or the TTL passes, the
+    run is cancelled and its result discarded. At most one run per key.
+    """
+
+    def __init__(self, runner: PipelineRunner, timers: TimerWheel, ttl_seconds: float = 300):
+        self.runner = runner
+        self.timers = timers
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self.stats_counters = {"started": 0, "claimed": 0, "discarded": 0, "expired": 0,
+                               "tokens_spent": 0, "tokens_wasted": 0}
+
+    def start(self, key: str, factory: Callable[[CancellationToken], Awaitable[Dict[str, Any]]]) -> bool:
+        """Start `factory(token)` on the shared loop unless a run for `key` is already warm"""
+        with self._lock:
+            if key in self._entries:
+                return False
+            # Fully built before it is published: claim/discard/expiry may run as soon as it is in the dict
+            token = CancellationToken(f"speculative-{key}")
+            entry = {"key": key, "token": token, "started_at": time.time(), "result": None}
+            entry["future"] = self.runner.run_coroutine(factory(token), on_done=lambda r: self._finished(entry, r))
+            token.on_cancel(entry["future"].cancel)
+            entry["timer"] = self.timers.schedule(self.ttl_seconds, self.discard, key, "expired")
+            self._entries[key] = entry
+            self.stats_counters["started"] += 1
+
+        speculation_logger.info(f"🔮 [SPECULATE] Started speculative run for {key}")
+        return True
+
+    def _finished(self, entry: Dict[str, Any], result: Dict[str, Any]):
+        entry["result"] = result
+        entry["completed_at"] = time.time()
+        self.stats_counters["tokens_spent"] += result.get("tokens", 0)
+
+    def claim(self, key: str) -> Optional[Dict[str, Any]]:
+        """Take ownership of the warm run for `key` (finished or still running)"""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return None
+            self.stats_counters["claimed"] += 1
+        self.timers.cancel(entry["timer"])
+        speculation_logger.info(f"🔮 [SPECULATE] Claimed speculative run for {key} "
+                                f"({'ready' if entry['result'] else 'still running'})")
+        return entry
+
+    def discard(self, key: str, reason: str = "discarded") -> bool:
+        """Cancel and drop the run for `key`; its tokens count as wasted"""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return False
+            self.stats_counters["expired" if reason == "expired" else "discarded"] += 1
+            if entry["result"]:
+                self.stats_counters["tokens_wasted"] += entry["result"].get("tokens", 0)
+        self.timers.cancel(entry["timer"])
+        entry["token"].cancel(reason)
+        speculation_logger.info(f"🔮 [SPECULATE] Discarded speculative run for {key} ({reason})")
+        return True
+
+    @staticmethod
+    async def result(entry: Dict[str, Any], timeout: float) -> Optional[Dict[str, Any]]:
+        """
+        Await a claimed run from the shared loop; None if it failed, was
+        cancelled or did not finish in time. Several stages may wait on the
+        same run, so a timeout in one must not cancel it for the others.
+        """
+        if entry["result"] is not None:
+            return entry["result"]
+        try:
+            return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(entry["future"])), timeout)
+        except asyncio.CancelledError:
+            if not entry["future"].cancelled():
+                raise  # the awaiting stage itself was cancelled
+            speculation_logger.info(f"🔮 [SPECULATE] Speculative run for {entry['key']} was cancelled")
+            return None
+        except Exception as e:
+            speculation_logger.info(f"🔮 [SPECULATE] Speculative run for {entry['key']} unusable: {e!r}")
+            return None
+
+    def warm(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {key: {"started_at": e["started_at"], "ready": e["result"] is not None}
+                    for key, e in self._entries.items()}
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.stats_counters, "warm": self.warm(), "ttl_seconds": self.ttl_seconds}
+
+    def shutdown(self):
+        for key in list(self._entries):
+            self.discard(key, "shutdown")
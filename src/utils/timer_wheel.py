@@ -0,0 +1,108 @@
+# ------------------------------------------------------------
+#  timer_wheel.py
+# ------------------------------------------------------------
+import itertools
+import logging
+import math
+import threading
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+timer_logger = logging.getLogger('agentic_ai_timers')
+
+DEFAULT_TICK_SECONDS = 0.1
+DEFAULT_SLOTS = 512  # 51.2s per revolution at the default tick
+
+
+class TimerWheel:
+    """
+    Hashed timing wheel driving every delayed action from one thread.
+    schedule() and cancel() are O(1); each tick only touches the timers
+    hashed into the current slot. Delays longer than one revolution carry
+    a round counter. Callbacks run on the wheel thread, so keep them short.
+    """
+
+    def __init__(self, tick_seconds: float = DEFAULT_TICK_SECONDS, slots: int = DEFAULT_SLOTS,
+                 name: str = "timer-wheel"):
+        self.tick_seconds = tick_seconds
+        self._slots: List[Dict[int, List[Any]]] = [{} for _ in range(slots)]
+        self._index: Dict[int, int] = {}  # timer id -> slot
+        self._ids = itertools.count(1)
+        self._cursor = 0
+        self._ticks = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self.stats_counters = {"scheduled": 0, "fired": 0, "cancelled": 0, "errors": 0, "max_lag_seconds": 0.0}
+        self._origin = time.monotonic()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def schedule(self, delay: float, callback: Callable, *args, **kwargs) -> int:
+        """Run `callback(*args, **kwargs)` after `delay` seconds; returns a timer id"""
+        ticks = max(1, math.ceil(delay / self.tick_seconds))
+        with self._lock:
+            timer_id = next(self._ids)
+            slot = (self._cursor + ticks - 1) % len(self._slots)
+            rounds = (ticks - 1) // len(self._slots)
+            self._slots[slot][timer_id] = [rounds, callback, args, kwargs]
+            self._index[timer_id] = slot
+            self.stats_counters["scheduled"] += 1
+        return timer_id
+
+    def cancel(self, timer_id: int) -> bool:
+        """Cancel a pending timer; False if it already fired or was cancelled"""
+        with self._lock:
+            slot = self._index.pop(timer_id, None)
+            if slot is None:
+                return False
+            del self._slots[slot][timer_id]
+            self.stats_counters["cancelled"] += 1
+            return True
+
+    def pending(self) -> int:
+        return len(self._index)
+
+    def _run(self):
+        while not self._stop.is_set():
+            due_at = self._origin + (self._ticks + 1) * self.tick_seconds
+            wait = due_at - time.monotonic()
+            if wait > 0 and self._stop.wait(wait):
+                break
+            self._tick(time.monotonic() - due_at)
+
+    def _tick(self, lag: float):
+        due: List[Tuple[Callable, tuple, dict]] = []
+        with self._lock:
+            bucket = self._slots[self._cursor]
+            for timer_id in list(bucket):
+                timer = bucket[timer_id]
+                if timer[0] > 0:
+                    timer[0] -= 1
+                    continue
+                del bucket[timer_id]
+                del self._index[timer_id]
+                due.append((timer[1], timer[2], timer[3]))
+            self._cursor = (self._cursor + 1) % len(self._slots)
+            self._ticks += 1
+            self.stats_counters["fired"] += len(due)
+            if due and lag > self.stats_counters["max_lag_seconds"]:
+                self.stats_counters["max_lag_seconds"] = lag
+
+        for callback, args, kwargs in due:
+            try:
+                callback(*args, **kwargs)
+            except Exception as e:
+                self.stats_counters["errors"] += 1
+                timer_logger.error(f"⏲️ [TIMER] Callback {getattr(callback, '__name__', callback)} failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self.stats_counters,
+                "pending": len(self._index),
+                "tick_seconds": self.tick_seconds,
+                "slots": len(self._slots),
+            }
+
+    def shutdown(self):
+        self._stop.set()
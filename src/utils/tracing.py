@@ -0,0 +1,177 @@
+# ------------------------------------------------------------
+#  tracing.py
+# ------------------------------------------------------------
+import atexit
+import functools
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict, Optional, Sequence
+
+tracing_logger = logging.getLogger('agentic_ai_tracing')
+
+# Optional OpenTelemetry SDK; without it every helper below is a no-op
+try:
+    from opentelemetry import context as otel_context
+    from opentelemetry import trace
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import (BatchSpanProcessor, ConsoleSpanExporter, SpanExporter,
+                                                SpanExportResult)
+    from opentelemetry.trace import Link, SpanKind, Status, StatusCode
+    TRACING_AVAILABLE = True
+except ImportError:
+    TRACING_AVAILABLE = False
+
+EXPORTERS = ("file", "console", "none")
+
+_tracer = None
+
+
+if TRACING_AVAILABLE:
+    class FileSpanExporter(SpanExporter):
+        """Appends one JSON span per line to a local file; no collector needed"""
+
+        def __init__(self, path: str):
+            if os.path.dirname(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+            self.path = path
+            self._lock = threading.Lock()
+
+        def export(self, spans) -> "SpanExportResult":
+            lines = "".join(span.to_json(indent=None) + "\n" for span in spans)
+            try:
+                with self._lock, open(self.path, "a", encoding="utf-8") as f:
+                    f.write(lines)
+            except OSError as e:
+                tracing_logger.error(f"⚠️ [TRACING] Could not write spans to {self.path}: {e}")
+                return SpanExportResult.FAILURE
+            return SpanExportResult.SUCCESS
+
+        def shutdown(self):
+            pass
+
+
+def configure(service_name: str, exporter: str = "file", path: str = "traces.jsonl") -> bool:
+    """Install a tracer provider exporting to a local file or the console; returns True if tracing is on"""
+    global _tracer
+    if exporter not in EXPORTERS:
+        raise ValueError(f"Unknown tracing exporter '{exporter}' (expected one of {', '.join(EXPORTERS)})")
+    if exporter == "none":
+        return False
+    if not TRACING_AVAILABLE:
+        tracing_logger.info("⚠️ [TRACING] opentelemetry-sdk not installed; tracing disabled")
+        return False
+
+    provider = TracerProvider(resource=Resource.create({"service.name": service_name}))
+    span_exporter = FileSpanExporter(path) if exporter == "file" else ConsoleSpanExporter()
+    provider.add_span_processor(BatchSpanProcessor(span_exporter))
+    trace.set_tracer_provider(provider)
+    atexit.register(provider.shutdown)  # flush buffered spans on exit
+    _tracer = trace.get_tracer(service_name)
+    tracing_logger.info(f"🔭 [TRACING] Exporting spans to {path if exporter == 'file' else 'console'}")
+    return True
+
+
+def enabled() -> bool:
+    return _tracer is not None
+
+
+@contextmanager
+def span(name: str, attributes: Optional[Dict[str, Any]] = None, kind: str = "internal",
+         links: Sequence[Any] = (), new_trace: bool = False):
+    """Child span of the current context (or a new trace); yields the span, or None when tracing is off"""
+    if _tracer is None:
+        yield None
+        return
+    parent = otel_context.Context() if new_trace else None
+    span_kind = SpanKind.SERVER if kind == "server" else SpanKind.INTERNAL
+    with _tracer.start_as_current_span(name, context=parent, kind=span_kind, links=list(links),
+                                       attributes=_clean(attributes)) as current:
+        yield current
+
+
+def set_attributes(attributes: Dict[str, Any]):
+    """Annotate the current span, if any"""
+    if _tracer is not None:
+        trace.get_current_span().set_attributes(_clean(attributes))
+
+
+def set_error(error: BaseException):
+    if _tracer is not None:
+        current = trace.get_current_span()
+        current.record_exception(error)
+        current.set_status(Status(StatusCode.ERROR, f"{type(error).__name__}: {error}"))
+
+
+def start_span(name: str, attributes: Optional[Dict[str, Any]] = None, kind: str = "internal") -> Any:
+    """Start a span and make it current until `end_span`, for hooks that cannot use `with` (e.g. Flask)"""
+    if _tracer is None:
+        return None
+    span_kind = SpanKind.SERVER if kind == "server" else SpanKind.INTERNAL
+    started = _tracer.start_span(name, kind=span_kind, attributes=_clean(attributes))
+    token = otel_context.attach(trace.set_span_in_context(started))
+    return started, token
+
+
+def end_span(handle: Any, attributes: Optional[Dict[str, Any]] = None, error: Optional[BaseException] = None):
+    if handle is None:
+        return
+    started, token = handle
+    if attributes:
+        started.set_attributes(_clean(attributes))
+    if error is not None:
+        started.record_exception(error)
+        started.set_status(Status(StatusCode.ERROR, f"{type(error).__name__}: {error}"))
+    started.end()
+    otel_context.detach(token)
+
+
+# ---- propagation across threads and tasks ----
+
+def capture() -> Any:
+    """The caller's trace context, to hand to another thread or task"""
+    return otel_context.get_current() if _tracer is not None else None
+
+
+def bind(func: Callable, ctx: Any = None) -> Callable:
+    """Wrap `func` to run under the given (default: current) trace context in whatever thread calls it"""
+    ctx = ctx if ctx is not None else capture()
+    if ctx is None:
+        return func
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        token = otel_context.attach(ctx)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            otel_context.detach(token)
+    return wrapper
+
+
+async def traced(coro: Awaitable[Any], name: str, attributes: Optional[Dict[str, Any]] = None,
+                 trigger: Any = None) -> Any:
+    """
+    Await `coro` inside its own root span, linked to the span that triggered it
+    (captured in the submitting thread), so a background pipeline gets its own
+    trace instead of stretching the request that started it.
+    """
+    if _tracer is None:
+        return await coro
+    links = []
+    if trigger is not None:
+        trigger_span = trace.get_current_span(trigger).get_span_context()
+        if trigger_span.is_valid:
+            links.append(Link(trigger_span))
+    with span(name, attributes, links=links, new_trace=True):
+        return await coro
+
+
+def _clean(attributes: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """OpenTelemetry attributes must be str/bool/int/float (or sequences of them), never None"""
+    if not attributes:
+        return {}
+    return {key: value if isinstance(value, (str, bool, int, float)) else str(value)
+            for key, value in attributes.items() if value is not None}
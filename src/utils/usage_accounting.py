@@ -0,0 +1,179 @@
+# ------------------------------------------------------------
+#  usage_accounting.py
+# ------------------------------------------------------------
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+# ------------------------------------------------------------
+# 1. Price table (USD per 1M tokens) - update with your Azure deployments
+# ------------------------------------------------------------
+MODEL_PRICING: Dict[str, Dict[str, float]] = {
+    "gpt-4o-mini": {"input": 0.15, "cached_input": 0.075, "output": 0.60},
+    "gpt-4o": {"input": 2.50, "cached_input": 1.25, "output": 10.00},
+    "gpt-4o-2": {"input": 2.50, "cached_input": 1.25, "output": 10.00},
+    "gpt-4.1-mini": {"input": 0.40, "cached_input": 0.10, "output": 1.60},
+    "model-router": {"input": 0.14, "cached_input": 0.035, "output": 0.0},
+    "gpt-4o-transcribe-diarize": {"input": 2.50, "cached_input": 2.50, "output": 10.00},
+}
+
+DEFAULT_PRICING = {"input": 2.50, "cached_input": 1.25, "output": 10.00}
+
+BUCKET_SECONDS = 60
+MAX_BUCKETS = 24 * 60  # one day of minute buckets
+
+
+def _field(obj: Any, name: str, default: Any = None) -> Any:
+    """Read a field from an SDK usage object or a plain dict"""
+    if obj is None:
+        return default
+    if isinstance(obj, dict):
+        return obj.get(name, default)
+    return getattr(obj, name, default)
+
+
+def extract_usage(usage: Any) -> Dict[str, int]:
+    """
+    Normalize the `usage` block of a chat completion / transcription response.
+    Cached prompt tokens live under prompt_tokens_details.cached_tokens.
+    """
+    prompt_tokens = _field(usage, "prompt_tokens", None)
+    if prompt_tokens is None:
+        prompt_tokens = _field(usage, "input_tokens", None)  # transcription responses
+    if prompt_tokens is None:
+        prompt_tokens = _field(usage, "input_token_count", 0)  # Agent Framework UsageDetails
+    completion_tokens = _field(usage, "completion_tokens", None)
+    if completion_tokens is None:
+        completion_tokens = _field(usage, "output_tokens", None)
+    if completion_tokens is None:
+        completion_tokens = _field(usage, "output_token_count", 0)
+
+    details = _field(usage, "prompt_tokens_details") or _field(usage, "input_tokens_details")
+    cached_tokens = _field(details, "cached_tokens", 0) or 0
+
+    total_tokens = _field(usage, "total_tokens", None)
+    if total_tokens is None:
+        total_tokens = _field(usage, "total_token_count", None)
+    if total_tokens is None:
+        total_tokens = prompt_tokens + completion_tokens
+
+    return {
+        "prompt_tokens": int(prompt_tokens or 0),
+        "cached_tokens": int(cached_tokens),
+        "completion_tokens": int(completion_tokens or 0),
+        "total_tokens": int(total_tokens or 0),
+    }
+
+
+def estimate_usage(prompt: str, completion: str) -> Dict[str, Any]:
+    """Approximate usage (~4 chars per token) when no API response is available"""
+    prompt_tokens = max(1, len(prompt) // 4)
+    completion_tokens = max(1, len(completion) // 4)
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+        "estimated": True,
+    }
+
+
+def compute_cost(model: str, usage: Dict[str, int]) -> float:
+    """Cost in USD for one call; cached prompt tokens are billed at the cached rate"""
+    pricing = MODEL_PRICING.get(model, DEFAULT_PRICING)
+    cached = min(usage["cached_tokens"], usage["prompt_tokens"])
+    uncached = usage["prompt_tokens"] - cached
+    return (
+        uncached * pricing["input"]
+        + cached * pricing["cached_input"]
+        + usage["completion_tokens"] * pricing["output"]
+    ) / 1_000_000
+
+
+def _empty_totals() -> Dict[str, Any]:
+    return {
+        "calls": 0,
+        "prompt_tokens": 0,
+        "cached_tokens": 0,
+        "completion_tokens": 0,
+        "total_tokens": 0,
+        "cost_usd": 0.0,
+    }
+
+
+def _add(totals: Dict[str, Any], entry: Dict[str, Any]):
+    totals["calls"] += 1
+    totals["prompt_tokens"] += entry["prompt_tokens"]
+    totals["cached_tokens"] += entry["cached_tokens"]
+    totals["completion_tokens"] += entry["completion_tokens"]
+    totals["total_tokens"] += entry["total_tokens"]
+    totals["cost_usd"] += entry["cost_usd"]
+
+
+# ------------------------------------------------------------
+# 2. Ledger: aggregates by agent, model, incident and time bucket
+# ------------------------------------------------------------
+class UsageLedger:
+    """Thread-safe token and cost aggregation driven by API usage fields"""
+
+    def __init__(self, bucket_seconds: int = BUCKET_SECONDS, max_buckets: int = MAX_BUCKETS):
+        self.bucket_seconds = bucket_seconds
+        self.max_buckets = max_buckets
+        self._lock = threading.Lock()
+        self.totals = _empty_totals()
+        self.by_agent: Dict[str, Dict[str, Any]] = {}
+        self.by_model: Dict[str, Dict[str, Any]] = {}
+        self.by_incident: Dict[str, Dict[str, Any]] = {}
+        self.by_bucket: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+
+    def record(self, agent_type: str, model: str, usage: Any,
+               incident_id: Optional[str] = None, timestamp: Optional[float] = None) -> Dict[str, Any]:
+        """Account one model call and return the normalized entry"""
+        normalized = extract_usage(usage)
+        entry = {
+            "agent_type": agent_type,
+            "model": model,
+            "incident_id": incident_id,
+            "timestamp": timestamp if timestamp is not None else time.time(),
+            "estimated": bool(_field(usage, "estimated", False)),
+            **normalized,
+        }
+        entry["cost_usd"] = compute_cost(model, normalized)
+        bucket = int(entry["timestamp"] // self.bucket_seconds) * self.bucket_seconds
+
+        with self._lock:
+            _add(self.totals, entry)
+            _add(self.by_agent.setdefault(agent_type, _empty_totals()), entry)
+            _add(self.by_model.setdefault(model, _empty_totals()), entry)
+            if incident_id:
+                _add(self.by_incident.setdefault(incident_id, _empty_totals()), entry)
+            if bucket not in self.by_bucket:
+                self.by_bucket[bucket] = _empty_totals()
+                while len(self.by_bucket) > self.max_buckets:
+                    self.by_bucket.popitem(last=False)
+            _add(self.by_bucket[bucket], entry)
+
+        return entry
+
+    def agent_totals(self, agent_type: str) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self.by_agent.get(agent_type) or _empty_totals())
+
+    def model_totals(self) -> Dict[str, Dict[str, Any]]:
+        """Running totals per model only (cheap; does not copy per-incident history)"""
+        with self._lock:
+            return {k: dict(v) for k, v in self.by_model.items()}
+
+    def snapshot(self, bucket_limit: int = 60) -> Dict[str, Any]:
+        """Copy of all aggregates for analytics endpoints"""
+        with self._lock:
+            buckets = list(self.by_bucket.items())[-bucket_limit:] if bucket_limit > 0 else []
+            return {
+                "totals": dict(self.totals),
+                "by_agent": {k: dict(v) for k, v in self.by_agent.items()},
+                "by_model": {k: dict(v) for k, v in self.by_model.items()},
+                "by_incident": {k: dict(v) for k, v in self.by_incident.items()},
+                "time_buckets": [{"bucket_start": start, **dict(v)} for start, v in buckets],
+                "bucket_seconds": self.bucket_seconds,
+                "pricing": MODEL_PRICING,
+            }
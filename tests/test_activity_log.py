@@ -0,0 +1,88 @@
+import itertools
+import threading
+
+from activity_log import ActivityLog
+
+
+def activity(version, agent="triage", model="gpt-4o", tokens=10):
+    return {"version": version, "agent_type": agent, "model": model, "tokens_used": tokens}
+
+
+def filled(capacity, count):
+    log = ActivityLog(capacity=capacity)
+    for version in range(1, count + 1):
+        log.append(activity(version))
+    return log
+
+
+def versions(activities):
+    return [a["version"] for a in activities]
+
+
+def test_buffer_keeps_only_the_newest_activities():
+    log = filled(capacity=3, count=5)
+    assert len(log) == 3 and log.total == 5
+    assert versions(log) == [3, 4, 5]
+
+
+def test_recent_returns_the_newest_oldest_first():
+    log = filled(capacity=5, count=5)
+    assert versions(log.recent(2)) == [4, 5]
+    assert versions(log.recent(50)) == [1, 2, 3, 4, 5]
+
+
+def test_since_returns_newer_activities_without_truncation():
+    log = filled(capacity=5, count=5)
+    newer, truncated = log.since(3)
+    assert versions(newer) == [4, 5] and not truncated
+    assert log.since(5) == ([], False)
+
+
+def test_since_flags_truncation_when_the_cursor_predates_eviction():
+    log = filled(capacity=3, count=5)  # versions 1 and 2 evicted
+    newer, truncated = log.since(0)
+    assert versions(newer) == [3, 4, 5] and truncated
+    newer, truncated = log.since(1)
+    assert versions(newer) == [3, 4, 5] and truncated
+    newer, truncated = log.since(2)
+    assert versions(newer) == [3, 4, 5] and not truncated
+
+
+def test_aggregates_cover_evicted_activities():
+    log = ActivityLog(capacity=2)
+    log.append(activity(1, agent="triage", model="gpt-4o", tokens=100))
+    log.append(activity(2, agent="triage", model="gpt-4o-mini", tokens=20))
+    log.append(activity(3, agent="analyzer", model="gpt-4o", tokens=5))
+    assert log.agent_counts("triage") == {"actions": 2, "tokens": 120}
+    assert log.agent_counts("analyzer") == {"actions": 1, "tokens": 5}
+    assert log.agent_counts("unknown") == {"actions": 0, "tokens": 0}
+    assert log.model_tokens() == {"gpt-4o": 105, "gpt-4o-mini": 20}
+
+
+def test_aggregate_reads_are_copies():
+    log = filled(capacity=2, count=1)
+    log.agent_counts("triage")["actions"] = 99
+    log.model_tokens()["gpt-4o"] = 99
+    assert log.agent_counts("triage")["actions"] == 1 and log.model_tokens()["gpt-4o"] == 10
+
+
+def test_since_stops_at_the_until_version():
+    log = filled(capacity=5, count=5)
+    newer, truncated = log.since(1, until=3)
+    assert versions(newer) == [2, 3] and not truncated
+
+
+def test_versions_are_stamped_in_buffer_order_across_threads():
+    log = ActivityLog(capacity=10000)
+    counter = itertools.count(1)
+
+    def writer():
+        for _ in range(500):
+            log.append({"agent_type": "triage", "model": "gpt-4o", "tokens_used": 1}, version=lambda: next(counter))
+
+    threads = [threading.Thread(target=writer) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert versions(log) == list(range(1, 4001))
@@ -0,0 +1,88 @@
+import asyncio
+
+import pytest
+
+from agent_consultation import FIRST_VALID, QUORUM, ConsultationFailed, consult, merge_by_agreement
+
+GOOD = "Database connection pool exhausted, reset the pool"
+
+
+def answer(value, delay=0.0, log=None, name=None):
+    async def call():
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            if log is not None:
+                log.append(name)
+            raise
+        if isinstance(value, Exception):
+            raise value
+        return value
+    return call
+
+
+def valid(text):
+    return isinstance(text, str) and len(text.split()) >= 5
+
+
+def test_first_valid_answer_wins_and_slower_calls_are_cancelled():
+    cancelled = []
+    outcome = asyncio.run(consult({
+        "triage": answer(GOOD, 0.5, cancelled, "triage"),
+        "analyzer": answer("Search index corrupted, rebuild the index", 0.01),
+    }, validate=valid))
+    assert outcome["winner"] == "analyzer" and outcome["mode"] == FIRST_VALID
+    assert outcome["answer"].startswith("Search index")
+    assert outcome["cancelled"] == ["triage"] and cancelled == ["triage"]
+    assert outcome["elapsed"] < 0.4
+
+
+def test_invalid_and_failed_answers_do_not_win():
+    outcome = asyncio.run(consult({
+        "fast_but_empty": answer("ok", 0.0),
+        "fast_but_broken": answer(RuntimeError("503"), 0.0),
+        "slow_but_good": answer(GOOD, 0.05),
+    }, validate=valid))
+    assert outcome["winner"] == "slow_but_good"
+    assert outcome["rejected"] == {"fast_but_empty": "failed validation"}
+    assert outcome["failed"] == {"fast_but_broken": "RuntimeError: 503"}
+    assert outcome["cancelled"] == []
+
+
+def test_no_valid_answer_raises():
+    with pytest.raises(ConsultationFailed, match="No valid answer"):
+        asyncio.run(consult({"a": answer("no"), "b": answer(ValueError("bad"))}, validate=valid))
+
+
+def test_timeout_cancels_everything_still_running():
+    cancelled = []
+    with pytest.raises(ConsultationFailed):
+        asyncio.run(consult({"a": answer(GOOD, 5, cancelled, "a"), "b": answer(GOOD, 5, cancelled, "b")},
+                            validate=valid, timeout=0.05))
+    assert sorted(cancelled) == ["a", "b"]
+
+
+def test_quorum_waits_for_enough_valid_answers_and_merges_them():
+    answers = {
+        "a": answer("connection pool exhausted on the search database", 0.01),
+        "b": answer("search database connection pool exhausted again", 0.02),
+        "c": answer("network partition between zones isolates search", 0.03),
+        "d": answer(GOOD, 1.0),
+    }
+    outcome = asyncio.run(consult(answers, validate=valid, mode=QUORUM, quorum=3))
+    assert outcome["quorum_met"] and [v["agent"] for v in outcome["valid"]] == ["a", "b", "c"]
+    assert outcome["answer"] in ("connection pool exhausted on the search database",
+                                 "search database connection pool exhausted again")
+    assert outcome["cancelled"] == ["d"]
+
+
+def test_quorum_not_met_still_returns_the_valid_answers():
+    outcome = asyncio.run(consult({"a": answer(GOOD, 0.01), "b": answer("no", 0.01)},
+                                  validate=valid, mode=QUORUM, quorum=2))
+    assert not outcome["quorum_met"] and outcome["answer"] == GOOD
+
+
+def test_merge_picks_the_answer_closest_to_the_others():
+    assert merge_by_agreement(["only one"]) == "only one"
+    answers = ["restart the search index service", "rebuild and restart search index", "scale the cart database"]
+    assert merge_by_agreement(answers) in answers[:2]
@@ -0,0 +1,54 @@
+import json
+
+import pytest
+
+import analytics_export
+from analytics_export import arrow_stream, columnar_stream, ndjson_stream
+
+COLUMNS = ("ts", "endpoint", "method", "status", "latency")
+CHUNKS = [
+    [(1.0, "/api/search", "GET", 200, 0.25), (2.0, "/api/cart", "POST", 500, 1.5)],
+    [(3.0, "/api/search", "GET", 200, 0.1)],
+]
+
+
+def test_ndjson_writes_one_object_per_row_and_one_string_per_chunk():
+    parts = list(ndjson_stream(COLUMNS, CHUNKS))
+    assert len(parts) == 2 and all(part.endswith("\n") for part in parts)
+    records = [json.loads(line) for part in parts for line in part.splitlines()]
+    assert records[1] == {"ts": 2.0, "endpoint": "/api/cart", "method": "POST", "status": 500, "latency": 1.5}
+    assert [r["ts"] for r in records] == [1.0, 2.0, 3.0]
+
+
+def test_ndjson_passes_stored_documents_through():
+    document = json.dumps({"id": "INC-1", "timeline": []})
+    parts = list(ndjson_stream(("id", "started_at", "data"), [[("INC-1", 1.0, document)]]))
+    assert parts == [document + "\n"]
+
+
+def test_columnar_writes_a_header_then_one_line_of_columns_per_chunk():
+    lines = "".join(columnar_stream("requests", COLUMNS, CHUNKS)).splitlines()
+    assert json.loads(lines[0]) == {"dataset": "requests", "columns": list(COLUMNS)}
+    assert json.loads(lines[1]) == [[1.0, 2.0], ["/api/search", "/api/cart"], ["GET", "POST"], [200, 500],
+                                    [0.25, 1.5]]
+    assert json.loads(lines[2])[0] == [3.0]
+
+
+def test_columnar_drops_document_columns():
+    lines = list(columnar_stream("incidents", ("id", "started_at", "data"), [[("INC-1", 1.0, "{}")]]))
+    assert json.loads(lines[0])["columns"] == ["id", "started_at"]
+    assert json.loads(lines[1]) == [["INC-1"], [1.0]]
+
+
+def test_arrow_requires_pyarrow(monkeypatch):
+    monkeypatch.setattr(analytics_export, "PYARROW_AVAILABLE", False)
+    with pytest.raises(RuntimeError, match="pyarrow"):
+        next(arrow_stream(COLUMNS, CHUNKS))
+
+
+def test_arrow_stream_round_trips():
+    pa = pytest.importorskip("pyarrow")
+    table = pa.ipc.open_stream(b"".join(arrow_stream(COLUMNS, CHUNKS))).read_all()
+    assert table.column_names == list(COLUMNS)
+    assert table.column("latency").to_pylist() == [0.25, 1.5, 0.1]
+    assert table.schema.field("status").type == pa.int64()
@@ -0,0 +1,99 @@
+import time
+
+import pytest
+
+from analytics_store import AnalyticsStore
+
+DAY = 86400
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = AnalyticsStore(str(tmp_path / "data" / "analytics.db"), retention_days=1, batch_size=10,
+                           flush_interval=0.05)
+    yield store
+    store.close()
+
+
+def usage(ts, model="gpt-4o", agent="triage", tokens=100, incident=None):
+    return {"timestamp": ts, "agent_type": agent, "model": model, "incident_id": incident,
+            "prompt_tokens": tokens - 20, "cached_tokens": 0, "completion_tokens": 20,
+            "total_tokens": tokens, "cost_usd": tokens / 1000, "estimated": False}
+
+
+def incident(incident_id, started_at, service="search"):
+    return {"id": incident_id, "started_at": started_at, "service": service, "severity": "high",
+            "status": "resolved", "resolution_time_seconds": 42.0}
+
+
+def test_rows_are_written_in_batches(store):
+    now = time.time()
+    for i in range(25):
+        store.record_activity({"agent_type": "triage", "model": "gpt-4o", "tokens_used": i}, ts=now + i)
+    store.close()
+    stats = store.stats()
+    assert stats["enqueued"] == 25 and stats["written"] == 25 and stats["dropped"] == 0
+    assert stats["batches"] >= 3 and stats["errors"] == 0
+    rows = store.activities(limit=5)
+    assert [row["tokens"] for row in rows] == [24, 23, 22, 21, 20]
+
+
+def test_retention_prunes_rows_past_the_horizon(store):
+    now, old = time.time(), time.time() - 2 * DAY
+    store.record_activity({"agent_type": "triage", "tokens_used": 1}, ts=old)
+    store.record_activity({"agent_type": "triage", "tokens_used": 2}, ts=now)
+    store.record_usage(usage(old))
+    store.record_usage(usage(now))
+    store.record_incident(incident("INC-old", old))
+    store.record_incident(incident("INC-new", now))
+    store.close()  # the writer runs a retention pass on the way out
+
+    assert store.stats()["pruned"] == 3
+    assert [row["tokens"] for row in store.activities()] == [2]
+    assert [i["id"] for i in store.incidents()] == ["INC-new"]
+    assert store.usage_summary()[0]["calls"] == 1
+
+
+def test_incidents_are_upserted_and_filtered(store):
+    now = time.time()
+    store.record_incident({**incident("INC-1", now), "status": "open"})
+    store.record_incident(incident("INC-1", now))
+    store.record_incident(incident("INC-2", now + 1, service="cart"))
+    store.close()
+    assert [i["status"] for i in store.incidents(service="search")] == ["resolved"]
+    assert [i["id"] for i in store.incidents()] == ["INC-2", "INC-1"]
+
+
+def test_usage_summary_groups_and_buckets(store):
+    base = (time.time() // 60) * 60
+    store.record_usage(usage(base + 1, model="gpt-4o", tokens=100))
+    store.record_usage(usage(base + 2, model="gpt-4o-mini", tokens=50))
+    store.record_usage(usage(base + 61, model="gpt-4o", tokens=300, agent="analyzer"))
+    store.close()
+
+    by_model = {row["model"]: row for row in store.usage_summary(group_by="model")}
+    assert by_model["gpt-4o"]["total_tokens"] == 400 and by_model["gpt-4o"]["calls"] == 2
+    assert [row["total_tokens"] for row in store.usage_summary(group_by="agent_type", agent_type="analyzer")] == [300]
+    buckets = store.usage_summary(group_by="model", bucket_seconds=60, model="gpt-4o")
+    assert [(row["bucket"], row["total_tokens"]) for row in buckets] == [(base, 100), (base + 60, 300)]
+    with pytest.raises(ValueError, match="group_by"):
+        store.usage_summary(group_by="cost_usd")
+
+
+def test_series_points_and_export_chunks(store):
+    base = (time.time() // 10) * 10
+    for i in range(5):
+        store.record_usage(usage(base + i, tokens=100))
+    store.record_request("/api/search", "GET", 200, 0.25)
+    store.close()
+
+    assert list(store.series_points("token_rate", bucket_seconds=10)) == [(base, 50.0)]
+    assert [value for _, value in store.series_points("response_time", endpoint="/api/search")] == [0.25]
+    with pytest.raises(ValueError, match="Unknown series"):
+        list(store.series_points("cpu"))
+
+    chunks = list(store.export_chunks("usage", start=base + 1, chunk_size=2))
+    assert [len(chunk) for chunk in chunks] == [2, 2]
+    assert chunks[0][0][0] == base + 1
+    with pytest.raises(ValueError, match="Unknown dataset"):
+        list(store.export_chunks("secrets"))
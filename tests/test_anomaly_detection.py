@@ -0,0 +1,94 @@
+import random
+
+import pytest
+
+from anomaly_detection import DEGRADED, DOWN, HEALTHY, CusumDetector, HealthMonitor, ServiceHealthDetector
+
+
+def steady(detector, n=500, mean=0.3, sd=0.05, seed=1):
+    rng = random.Random(seed)
+    for _ in range(n):
+        detector.observe(max(rng.gauss(mean, sd), 0.0), False)
+    return rng
+
+
+def test_no_alarm_during_warmup_even_on_wild_values():
+    detector = CusumDetector(warmup=30)
+    assert not any(detector.update(v) for v in [0.3, 5.0, 0.1, 9.0] * 7)
+    assert detector.cusum == 0.0
+
+
+def test_steady_traffic_stays_healthy():
+    detector = ServiceHealthDetector("search")
+    steady(detector, n=5000)
+    assert detector.state == HEALTHY and detector.transitions == 0
+
+
+def test_latency_shift_is_detected_within_a_few_requests():
+    detector = ServiceHealthDetector("search")
+    steady(detector)
+    changes = [detector.observe(0.6, False) for _ in range(10)]
+    assert DEGRADED in changes[:5]
+
+
+def test_baseline_is_frozen_while_alarmed():
+    detector = ServiceHealthDetector("search")
+    steady(detector)
+    baseline = detector.latency.mean
+    for _ in range(200):
+        detector.observe(3.0, False)
+    assert detector.latency.mean == pytest.approx(baseline)
+
+
+def test_cusum_is_capped_so_recovery_is_bounded():
+    detector = ServiceHealthDetector("search")
+    rng = steady(detector)
+    for _ in range(60):
+        detector.observe(3.0, False)
+    assert detector.latency.cusum <= detector.latency.cap * detector.latency.h
+
+    for i in range(200):
+        if detector.observe(max(rng.gauss(0.3, 0.05), 0.0), False) == HEALTHY:
+            break
+    assert detector.state == HEALTHY and i < 60
+
+    # A second, unrelated degradation alarms again
+    assert DEGRADED in [detector.observe(3.0, False) for _ in range(10)]
+
+
+def test_error_rate_drives_degraded_then_down():
+    detector = ServiceHealthDetector("search", min_samples=5)
+    steady(detector, n=100)
+    states = [detector.observe(0.3, True) for _ in range(40)]
+    assert states.index(DEGRADED) < states.index(DOWN)
+    assert detector.state == DOWN
+
+
+def test_recovery_steps_down_through_degraded():
+    detector = ServiceHealthDetector("search")
+    rng = steady(detector, n=100)
+    for _ in range(40):
+        detector.observe(0.3, True)
+    assert detector.state == DOWN
+    changes = [c for c in (detector.observe(max(rng.gauss(0.3, 0.05), 0.0), False) for _ in range(300)) if c]
+    assert changes == [DEGRADED, HEALTHY]
+
+
+def test_missing_latency_keeps_the_current_latency_alarm():
+    detector = ServiceHealthDetector("search", min_samples=1000)
+    steady(detector)
+    for _ in range(20):
+        detector.observe(3.0, False)
+    assert detector.observe(None, True) is None and detector.state == DEGRADED
+
+
+def test_monitor_tracks_services_independently():
+    monitor = HealthMonitor()
+    for _ in range(100):
+        monitor.observe("search", 0.3, False)
+        monitor.observe("cart", 0.3, False)
+    changes = [monitor.observe("search", 0.3, True) for _ in range(40)]
+    assert DOWN in changes
+    assert monitor.state("search") == DOWN and monitor.state("cart") == HEALTHY
+    assert monitor.state("unknown") == HEALTHY
+    assert set(monitor.snapshot()) == {"search", "cart"}
@@ -0,0 +1,44 @@
+import pytest
+
+from audiences import (ANALYTICS, AUDIENCES, COMPACT_ROOM, SEARCH, STOREFRONT, SubscriptionError, compact_room,
+                       incident_room, parse_subscription, rooms_for)
+
+
+def test_broadcast_events_reach_only_the_pages_that_render_them():
+    assert rooms_for("banner_update") == (STOREFRONT, SEARCH)
+    assert rooms_for("system_status") == (STOREFRONT,)
+    assert rooms_for("analytics_delta") == (ANALYTICS,)
+    assert rooms_for("incident_update") == ()
+
+
+def test_room_names():
+    assert incident_room("INC-1") == "incident:INC-1"
+    assert compact_room(ANALYTICS) == "analytics#msgpack"
+    assert compact_room(incident_room("INC-1")) == "incident:INC-1#msgpack"
+    assert COMPACT_ROOM not in {compact_room(audience) for audience in AUDIENCES}
+
+
+@pytest.mark.parametrize("data, expected", [
+    ({"audience": "storefront"}, ("audience", STOREFRONT)),
+    ({"audience": "analytics", "incident": "INC-1"}, ("audience", ANALYTICS)),
+    ({"incident": "INC-1"}, ("incident", "INC-1")),
+    ({"incident": 42}, ("incident", "42")),
+])
+def test_valid_subscriptions(data, expected):
+    assert parse_subscription(data) == expected
+
+
+@pytest.mark.parametrize("data, message", [
+    ("storefront", "must be an object"),
+    (None, "must be an object"),
+    ({"audience": "admin"}, "Unknown audience 'admin'"),
+    ({"incident": ""}, "must name"),
+    ({}, "must name"),
+])
+def test_invalid_subscriptions(data, message):
+    with pytest.raises(SubscriptionError, match=message):
+        parse_subscription(data)
+
+
+def test_subscription_errors_are_value_errors():
+    assert issubclass(SubscriptionError, ValueError)
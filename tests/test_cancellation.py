@@ -0,0 +1,74 @@
+import threading
+import time
+
+import pytest
+
+from cancellation import CancellationToken, OperationCancelled
+
+
+def test_token_fires_once_and_keeps_the_first_reason():
+    token = CancellationToken("INC-1")
+    assert not token.cancelled and token.reason is None
+    assert token.cancel("merged into INC-0") is True
+    assert token.cancel("shutdown") is False
+    assert token.cancelled and token.reason == "merged into INC-0"
+
+
+def test_callbacks_run_once_on_cancel_or_immediately_if_already_cancelled():
+    token = CancellationToken()
+    calls = []
+    token.on_cancel(lambda: calls.append("before"))
+    token.cancel()
+    token.cancel()
+    assert calls == ["before"]
+    token.on_cancel(lambda: calls.append("after"))
+    assert calls == ["before", "after"]
+
+
+def test_failing_callback_does_not_stop_the_others():
+    token = CancellationToken()
+    calls = []
+
+    def broken():
+        raise RuntimeError("timer already gone")
+
+    token.on_cancel(broken)
+    token.on_cancel(lambda: calls.append("ran"))
+    assert token.cancel() is True
+    assert calls == ["ran"]
+
+
+def test_raise_if_cancelled_names_the_operation_and_reason():
+    token = CancellationToken()
+    token.raise_if_cancelled("model call")  # not cancelled: no-op
+    token.cancel("manual resolution")
+    with pytest.raises(OperationCancelled, match="model call cancelled: manual resolution"):
+        token.raise_if_cancelled("model call")
+
+
+def test_wait_is_a_sleep_cut_short_by_cancel():
+    token = CancellationToken()
+    assert token.wait(0.01) is False
+    threading.Timer(0.05, token.cancel).start()
+    started = time.monotonic()
+    assert token.wait(5) is True
+    assert time.monotonic() - started < 1
+
+
+def test_concurrent_cancels_fire_callbacks_exactly_once():
+    token = CancellationToken()
+    calls, winners = [], []
+    token.on_cancel(lambda: calls.append(1))
+    barrier = threading.Barrier(8)
+
+    def cancel():
+        barrier.wait()
+        if token.cancel(threading.current_thread().name):
+            winners.append(threading.current_thread().name)
+
+    threads = [threading.Thread(target=cancel) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert calls == [1] and winners == [token.reason]
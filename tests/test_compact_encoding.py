@@ -0,0 +1,71 @@
+import pytest
+
+import compact_encoding
+from compact_encoding import ACTIVITY_FIELDS, JSON, MSGPACK, CompactEncoder, parse_encoding
+
+TRIAGE = {"agent_type": "triage", "agent_name": "Triage Agent", "model": "gpt-4o",
+          "model_description": "Advanced reasoning"}
+
+
+def activity(i, agent=TRIAGE):
+    return {**agent, "id": f"act-{i}", "timestamp": "2026-10-19T00:00:00", "action": "diagnose",
+            "tokens_used": 100 + i, "incident_id": "INC-1", "version": i}
+
+
+@pytest.mark.parametrize("data, expected", [
+    ({"encoding": "msgpack"}, MSGPACK), ({"encoding": "json"}, JSON), ({}, JSON), (None, JSON), ("msgpack", JSON),
+])
+def test_parse_encoding(data, expected):
+    assert parse_encoding(data) == expected
+
+
+def test_parse_encoding_rejects_unknown_encodings():
+    with pytest.raises(ValueError, match="Unknown encoding 'cbor'"):
+        parse_encoding({"encoding": "cbor"})
+
+
+def test_encoder_requires_msgpack(monkeypatch):
+    monkeypatch.setattr(compact_encoding, "MSGPACK_AVAILABLE", False)
+    with pytest.raises(RuntimeError, match="msgpack"):
+        CompactEncoder()
+
+
+def test_activities_become_rows_indexing_a_session_dictionary():
+    msgpack = pytest.importorskip("msgpack")
+    encoder = CompactEncoder()
+    analyzer = {**TRIAGE, "agent_type": "analyzer", "agent_name": "Analyzer Agent"}
+
+    data, new_entries = encoder.encode("agent_activities", [activity(1), activity(2, analyzer)])
+    rows = msgpack.unpackb(data)
+    assert new_entries == {0: list(TRIAGE.values()), 1: list(analyzer.values())}
+    assert rows[0] == ["act-1", "2026-10-19T00:00:00", 0, "diagnose", 101, "INC-1", 1]
+    assert rows[1][ACTIVITY_FIELDS.index("agent")] == 1
+
+    # known agents are not announced again
+    _, new_entries = encoder.encode("agent_activities", [activity(3)])
+    assert new_entries is None
+    assert len(encoder.dictionary()["agents"]) == 2
+
+
+def test_delta_payloads_keep_their_other_fields():
+    msgpack = pytest.importorskip("msgpack")
+    encoder = CompactEncoder()
+    payload = {"version": 7, "new_activities": [activity(1)], "truncated": False}
+    decoded = msgpack.unpackb(encoder.encode("analytics_delta", payload)[0])
+    assert decoded["version"] == 7 and decoded["truncated"] is False
+    assert decoded["new_activities"][0][0] == "act-1"
+    assert payload["new_activities"][0]["agent_name"] == "Triage Agent"  # caller's payload untouched
+
+
+def test_report_compares_json_and_compact_sizes():
+    pytest.importorskip("msgpack")
+    encoder = CompactEncoder()
+    for i in range(3):
+        encoder.encode("agent_activities", [activity(j) for j in range(20)])
+    encoder.encode("system_status", {"status": "healthy"})
+    report = encoder.report()
+    assert report["dictionary_agents"] == 1
+    activities = report["events"]["agent_activities"]
+    assert activities["messages"] == 3
+    assert activities["compact_bytes_per_message"] < activities["json_bytes_per_message"]
+    assert 0 < activities["saving"] < 1
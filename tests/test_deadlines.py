@@ -0,0 +1,76 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+import deadlines
+from deadlines import DeadlineExceeded
+
+
+def test_no_deadline_means_no_budget():
+    assert deadlines.remaining() is None
+    assert deadlines.timeout_for(30) == 30
+    deadlines.check()  # does not raise
+
+
+def test_nested_deadlines_can_only_shrink_the_budget():
+    with deadlines.deadline(0.5) as outer:
+        with deadlines.deadline(10) as inner:
+            assert inner == outer
+            assert deadlines.remaining() <= 0.5
+        with deadlines.deadline(0.1):
+            assert deadlines.remaining() <= 0.1
+        assert 0.1 < deadlines.remaining() <= 0.5
+    assert deadlines.remaining() is None
+
+
+def test_timeout_for_caps_downstream_calls_at_the_remaining_budget():
+    with deadlines.deadline(1.0):
+        assert deadlines.timeout_for(30) <= 1.0
+        assert deadlines.timeout_for(0.2) == 0.2
+
+
+def test_spent_budget_fails_fast():
+    with deadlines.deadline(0.01):
+        time.sleep(0.02)
+        with pytest.raises(DeadlineExceeded, match="before search"):
+            deadlines.check("search")
+        with pytest.raises(DeadlineExceeded):
+            deadlines.timeout_for(30, "model call")
+    assert issubclass(DeadlineExceeded, TimeoutError)
+
+
+def test_sleep_never_outlives_the_budget():
+    with deadlines.deadline(0.05):
+        started = time.monotonic()
+        with pytest.raises(DeadlineExceeded, match="during backoff"):
+            deadlines.sleep(5, "backoff")
+        assert time.monotonic() - started < 1
+
+
+def test_decorator_applies_the_budget_per_call():
+    @deadlines.with_deadline(0.5)
+    def handler():
+        return deadlines.remaining()
+
+    assert 0 < handler() <= 0.5
+    assert deadlines.remaining() is None
+
+
+def test_budget_is_per_thread_and_per_task():
+    seen = []
+    with deadlines.deadline(0.5):
+        thread = threading.Thread(target=lambda: seen.append(deadlines.remaining()))
+        thread.start()
+        thread.join()
+    assert seen == [None]  # a new thread starts with an empty context
+
+    async def child():
+        return deadlines.remaining()
+
+    async def main():
+        with deadlines.deadline(0.5):
+            return await asyncio.ensure_future(child())  # tasks copy the current context
+
+    assert 0 < asyncio.run(main()) <= 0.5
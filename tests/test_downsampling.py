@@ -0,0 +1,62 @@
+import math
+
+import pytest
+
+from downsampling import SeriesCache, lttb
+
+
+def wave(n):
+    return [(float(i), math.sin(i / 20)) for i in range(n)]
+
+
+def test_output_has_threshold_points_and_keeps_the_endpoints():
+    points = wave(1000)
+    sampled = lttb(points, 50)
+    assert len(sampled) == 50
+    assert sampled[0] == points[0] and sampled[-1] == points[-1]
+    xs = [x for x, _ in sampled]
+    assert xs == sorted(xs) and len(set(xs)) == 50
+    assert set(sampled) <= set(points)
+
+
+def test_spikes_survive():
+    points = [(float(i), 0.0) for i in range(1000)]
+    points[437] = (437.0, 100.0)
+    points[802] = (802.0, -50.0)
+    sampled = lttb(points, 20)
+    assert (437.0, 100.0) in sampled and (802.0, -50.0) in sampled
+
+
+@pytest.mark.parametrize("threshold", [10, 11, 500])
+def test_small_series_and_tiny_thresholds_are_returned_unchanged(threshold):
+    points = wave(10)
+    assert lttb(points, threshold) == points
+    assert lttb(wave(100), 2) == wave(100)
+
+
+def test_missing_values_are_skipped():
+    assert lttb([(0.0, 1.0), (1.0, None), (2.0, 3.0)], 10) == [(0.0, 1.0), (2.0, 3.0)]
+    assert lttb(iter([]), 10) == []
+
+
+def test_cache_hits_and_evicts_least_recently_used():
+    cache = SeriesCache(max_entries=2)
+    calls = []
+
+    def compute(key):
+        return lambda: calls.append(key) or key.upper()
+
+    assert cache.get_or_compute("a", compute("a")) == "A"
+    assert cache.get_or_compute("a", compute("a")) == "A"
+    cache.get_or_compute("b", compute("b"))
+    cache.get_or_compute("a", compute("a"))  # a becomes most recent
+    cache.get_or_compute("c", compute("c"))  # evicts b
+    cache.get_or_compute("b", compute("b"))
+    assert calls == ["a", "b", "c", "b"]
+    stats = cache.stats()
+    assert stats["hits"] == 2 and stats["misses"] == 4 and stats["entries"] == 2
+    assert stats["hit_ratio"] == pytest.approx(2 / 6)
+
+
+def test_empty_cache_stats():
+    assert SeriesCache().stats() == {"hits": 0, "misses": 0, "entries": 0, "hit_ratio": 0.0}
@@ -0,0 +1,97 @@
+import time
+
+import pytest
+
+from emission import EmitScheduler
+
+
+@pytest.fixture
+def sent():
+    return []
+
+
+@pytest.fixture
+def scheduler(sent):
+    # a tick far in the future: the tests drive flush() themselves
+    scheduler = EmitScheduler(lambda event, payload, room: sent.append((event, payload, room)), interval=60,
+                              max_batch=3)
+    yield scheduler
+    scheduler.shutdown()
+
+
+def test_queued_items_go_out_as_one_message_per_event_and_room(scheduler, sent):
+    scheduler.queue("activity", 1)
+    scheduler.queue("activity", 2)
+    scheduler.queue("activity", 3, room="incident:INC-1")
+    assert sent == [] and scheduler.stats()["pending"] == 3
+    scheduler.flush()
+    assert sent == [("activity", [1, 2], None), ("activity", [3], "incident:INC-1")]
+    stats = scheduler.stats()
+    assert stats["queued"] == 3 and stats["batched_messages"] == 2 and stats["pending"] == 0
+    scheduler.flush()
+    assert len(sent) == 2 and scheduler.stats()["flushes"] == 1
+
+
+def test_bursts_beyond_max_batch_keep_the_newest_items(scheduler, sent):
+    for i in range(5):
+        scheduler.queue("activity", i)
+    scheduler.flush()
+    assert sent == [("activity", [2, 3, 4], None)]
+    assert scheduler.stats()["dropped"] == 2
+
+
+def test_watches_send_only_when_the_key_changes(scheduler, sent):
+    state = {"version": 1}
+    scheduler.watch("metrics", lambda: state["version"], build=lambda old, new: {"from": old, "to": new})
+    scheduler.flush()  # first key is only recorded
+    scheduler.flush()
+    assert sent == []
+    state["version"] = 3
+    scheduler.flush()
+    scheduler.flush()
+    assert sent == [("metrics", {"from": 1, "to": 3}, None)]
+    assert scheduler.stats()["snapshots_sent"] == 1 and scheduler.stats()["watched"] == ["metrics"]
+
+
+def test_send_initial_and_skipped_payloads(scheduler, sent):
+    state = {"version": 1}
+    scheduler.watch("chart", lambda: state["version"], send_initial=True)
+    scheduler.watch("quiet", lambda: state["version"], build=lambda old, new: None, send_initial=True)
+    scheduler.flush()
+    assert sent == [("chart", 1, None)]
+
+
+def test_failures_are_counted_and_do_not_stop_the_tick(sent):
+    def emit(event, payload, room):
+        if event == "broken":
+            raise ConnectionError("socket closed")
+        sent.append((event, payload, room))
+
+    scheduler = EmitScheduler(emit, interval=60)
+    try:
+        scheduler.watch("bad_key", lambda: 1 / 0, send_initial=True)
+        scheduler.queue("broken", 1)
+        scheduler.queue("activity", 2)
+        scheduler.flush()
+        assert sent == [("activity", [2], None)]
+        assert scheduler.stats()["errors"] == 2
+    finally:
+        scheduler.shutdown()
+
+
+def test_shutdown_flushes_what_is_buffered(scheduler, sent):
+    scheduler.queue("activity", "last")
+    scheduler.shutdown()
+    assert sent == [("activity", ["last"], None)]
+
+
+def test_ticks_flush_on_their_own(sent):
+    scheduler = EmitScheduler(lambda event, payload, room: sent.append(payload), interval=0.01)
+    try:
+        scheduler.queue("activity", 1)
+        deadline = time.monotonic() + 2
+        while not sent and time.monotonic() < deadline:
+            time.sleep(0.005)
+        assert sent == [[1]]
+    finally:
+        scheduler.shutdown()
@@ -0,0 +1,168 @@
+import threading
+import time
+
+import pytest
+
+import incident_correlation
+from incident_correlation import FailureCorrelator
+
+
+class Clock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(incident_correlation.time, "time", clock.time)
+    return clock
+
+
+class Incidents:
+    """Stand-in for the registry: opens numbered incidents, tracks which are open"""
+
+    def __init__(self):
+        self.open_ids = set()
+        self.opened = 0
+
+    def open(self):
+        self.opened += 1
+        incident_id = f"INC-{self.opened}"
+        self.open_ids.add(incident_id)
+        return incident_id
+
+    def is_open(self, incident_id):
+        return incident_id in self.open_ids
+
+
+def report(correlator, incidents, service="search", error_class="timeout"):
+    return correlator.correlate(service, error_class, incidents.open, incidents.is_open)
+
+
+def test_repeats_within_the_window_fold_into_the_open_incident(clock):
+    correlator, incidents = FailureCorrelator(window_seconds=120), Incidents()
+    first = report(correlator, incidents)
+    assert first["incident_id"] == "INC-1" and not first["suppressed"]
+    for i in range(1, 4):
+        clock.now += 30
+        outcome = report(correlator, incidents)
+        assert outcome["incident_id"] == "INC-1" and outcome["suppressed"]
+        assert outcome["duplicates"] == i
+        assert outcome["fingerprint"] == first["fingerprint"]
+    assert incidents.opened == 1
+    assert correlator.suppression_ratio() == pytest.approx(0.75)
+
+
+def test_other_error_classes_on_the_same_service_fold_in_too(clock):
+    correlator, incidents = FailureCorrelator(), Incidents()
+    report(correlator, incidents, error_class="timeout")
+    outcome = report(correlator, incidents, error_class="http_503")
+    assert outcome["incident_id"] == "INC-1" and outcome["suppressed"]
+    other_service = report(correlator, incidents, service="cart")
+    assert other_service["incident_id"] == "INC-2" and not other_service["suppressed"]
+
+
+def test_resolved_incident_stops_absorbing_failures(clock):
+    correlator, incidents = FailureCorrelator(), Incidents()
+    report(correlator, incidents)
+    incidents.open_ids.clear()
+    clock.now += 5
+    outcome = report(correlator, incidents)
+    assert outcome["incident_id"] == "INC-2" and not outcome["suppressed"]
+    assert outcome["duplicates"] == 0
+
+
+def test_quiet_fingerprint_expires_after_the_window(clock):
+    correlator, incidents = FailureCorrelator(window_seconds=60), Incidents()
+    report(correlator, incidents, error_class="timeout")
+    clock.now += 61
+    report(correlator, incidents, service="cart")  # opening an incident sweeps expired fingerprints
+    assert [f["service"] for f in correlator.snapshot()["active_fingerprints"]] == ["cart"]
+
+    # The search incident is still open, so a late failure folds into it with a fresh fingerprint
+    outcome = report(correlator, incidents, error_class="timeout")
+    assert outcome["incident_id"] == "INC-1" and outcome["suppressed"]
+    assert outcome["fingerprint"] == correlator.fingerprint("search", "timeout", clock.now)
+
+
+def test_fingerprints_bucket_time_by_window():
+    correlator = FailureCorrelator(window_seconds=60)
+    assert correlator.fingerprint("search", "timeout", 600) == correlator.fingerprint("search", "timeout", 659)
+    assert correlator.fingerprint("search", "timeout", 600) != correlator.fingerprint("search", "timeout", 660)
+
+
+def test_no_incident_opened_counts_as_unhandled(clock):
+    correlator = FailureCorrelator()
+    outcome = correlator.correlate("search", "timeout", lambda: None, lambda i: True)
+    assert outcome["incident_id"] is None and not outcome["suppressed"]
+    assert correlator.stats["unhandled"] == 1
+
+
+def test_failure_storm_opens_exactly_one_incident():
+    correlator, incidents = FailureCorrelator(), Incidents()
+    opening = threading.Event()
+
+    def slow_open():
+        opening.set()
+        time.sleep(0.1)
+        return incidents.open()
+
+    outcomes = []
+    threads = [threading.Thread(target=lambda: outcomes.append(
+        correlator.correlate("search", "timeout", slow_open, incidents.is_open))) for _ in range(20)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert incidents.opened == 1
+    assert {o["incident_id"] for o in outcomes} == {"INC-1"}
+    assert sum(o["suppressed"] for o in outcomes) == 19
+    assert correlator.stats == {"failures": 20, "suppressed": 19, "incidents_opened": 1, "unhandled": 0}
+
+
+def test_opening_an_incident_does_not_block_other_services():
+    correlator, incidents = FailureCorrelator(), Incidents()
+    release = threading.Event()
+
+    def blocked_open():
+        release.wait(5)
+        return incidents.open()
+
+    search = threading.Thread(target=lambda: correlator.correlate("search", "timeout", blocked_open, incidents.is_open))
+    search.start()
+    time.sleep(0.05)
+    started = time.monotonic()
+    outcome = correlator.correlate("cart", "timeout", incidents.open, incidents.is_open)
+    assert time.monotonic() - started < 1 and outcome["incident_id"] is not None
+    snapshot = correlator.snapshot()  # the lock is not held during open_incident either
+    assert snapshot["incidents_opened"] == 1
+    release.set()
+    search.join()
+
+
+def test_report_from_inside_open_incident_does_not_deadlock():
+    correlator, incidents = FailureCorrelator(), Incidents()
+    nested = []
+
+    def open_and_report():
+        nested.append(correlator.correlate("search", "http_503", incidents.open, incidents.is_open))
+        return incidents.open()
+
+    outcome = correlator.correlate("search", "timeout", open_and_report, incidents.is_open)
+    assert outcome["incident_id"] == "INC-1"
+    assert nested[0]["suppressed"] and nested[0]["incident_id"] is None
+
+
+def test_failed_open_releases_the_reservation():
+    correlator, incidents = FailureCorrelator(), Incidents()
+
+    def broken_open():
+        raise RuntimeError("registry unavailable")
+
+    with pytest.raises(RuntimeError):
+        correlator.correlate("search", "timeout", broken_open, incidents.is_open)
+    assert report(correlator, incidents)["incident_id"] == "INC-1"
@@ -0,0 +1,171 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from cancellation import CancellationToken
+from incident_pipeline import IncidentPipeline, PipelineRunner, Stage, StageStatus
+
+
+def returning(value, delay=0.0):
+    async def func(ctx):
+        await asyncio.sleep(delay)
+        return value
+    return func
+
+
+def failing(message="boom"):
+    async def func(ctx):
+        raise RuntimeError(message)
+    return func
+
+
+def run(pipeline, **context):
+    return asyncio.run(pipeline.run(dict(context)))
+
+
+def test_stages_run_in_dependency_order_and_see_upstream_results():
+    async def fix(ctx):
+        return f"fixed {ctx['results']['triage']}"
+
+    pipeline = IncidentPipeline("p", [
+        Stage("fix", fix, depends_on=["triage"]),
+        Stage("triage", returning("pool exhaustion")),
+    ])
+    assert pipeline.order == ["triage", "fix"]
+    result = run(pipeline, incident_id="INC-1")
+    assert result["status"] == StageStatus.SUCCEEDED and result["incident_id"] == "INC-1"
+    assert result["stages"]["fix"]["result"] == "fixed pool exhaustion"
+
+
+@pytest.mark.parametrize("stages, message", [
+    ([Stage("a", returning(1), depends_on=["missing"])], "unknown stage"),
+    ([Stage("a", returning(1), depends_on=["b"]), Stage("b", returning(1), depends_on=["a"])], "Cycle"),
+    ([Stage("a", returning(1)), Stage("a", returning(2))], "Duplicate"),
+])
+def test_invalid_graphs_are_rejected(stages, message):
+    with pytest.raises(ValueError, match=message):
+        IncidentPipeline("p", stages)
+
+
+def test_independent_stages_run_concurrently():
+    pipeline = IncidentPipeline("p", [
+        Stage("monitor", returning(1)),
+        *[Stage(name, returning(name, delay=0.2), depends_on=["monitor"]) for name in ("triage", "notify", "analyze")],
+    ])
+    started = time.monotonic()
+    result = run(pipeline)
+    assert result["status"] == StageStatus.SUCCEEDED
+    assert time.monotonic() - started < 0.5  # three 0.2s stages in parallel, not 0.6s in sequence
+
+
+def test_critical_failure_skips_dependents_but_non_critical_does_not():
+    pipeline = IncidentPipeline("p", [
+        Stage("monitor", returning(1)),
+        Stage("triage", failing("no diagnosis"), depends_on=["monitor"]),
+        Stage("notify", failing("webhook down"), depends_on=["monitor"], critical=False),
+        Stage("fix", returning("ok"), depends_on=["triage"]),
+        Stage("announce", returning("ok"), depends_on=["notify"]),
+        Stage("verify", returning("ok"), depends_on=["fix"]),
+    ])
+    result = run(pipeline)
+    stages = result["stages"]
+    assert stages["triage"]["status"] == StageStatus.FAILED
+    assert stages["triage"]["error"] == "RuntimeError: no diagnosis"
+    assert stages["fix"]["status"] == StageStatus.SKIPPED and "triage" in stages["fix"]["error"]
+    assert stages["verify"]["status"] == StageStatus.SKIPPED  # propagates transitively
+    assert stages["announce"]["status"] == StageStatus.SUCCEEDED
+    assert result["status"] == StageStatus.FAILED
+    assert result["failed_stages"] == ["triage", "fix", "verify"]
+
+
+def test_timeouts_and_failures_are_retried_with_backoff():
+    calls = []
+
+    async def flaky(ctx):
+        calls.append(time.monotonic())
+        if len(calls) == 1:
+            await asyncio.sleep(1)  # first attempt times out
+        if len(calls) == 2:
+            raise RuntimeError("transient")
+        return "ok"
+
+    pipeline = IncidentPipeline("p", [Stage("s", flaky, timeout=0.05, retries=2, retry_backoff=0.01)])
+    record = run(pipeline)["stages"]["s"]
+    assert record["status"] == StageStatus.SUCCEEDED and record["attempts"] == 3
+    assert record["error"] is None
+
+    pipeline = IncidentPipeline("p", [Stage("s", returning(1, delay=1), timeout=0.05, retries=1,
+                                            retry_backoff=0.01)])
+    record = run(pipeline)["stages"]["s"]
+    assert record["status"] == StageStatus.TIMED_OUT and record["attempts"] == 2
+
+
+def test_cancellation_stops_running_stages_and_skips_the_rest():
+    token = CancellationToken("INC-1")
+    started = threading.Event()
+
+    async def slow(ctx):
+        started.set()
+        await asyncio.sleep(5)
+
+    pipeline = IncidentPipeline("p", [
+        Stage("monitor", returning(1)),
+        Stage("triage", slow, depends_on=["monitor"]),
+        Stage("fix", returning("ok"), depends_on=["triage"]),
+    ])
+
+    async def main():
+        run_task = asyncio.ensure_future(pipeline.run({"cancel_token": token}))
+        while not started.is_set():
+            await asyncio.sleep(0.01)
+        token.cancel("merged into INC-0")
+        return await run_task
+
+    began = time.monotonic()
+    result = asyncio.run(main())
+    assert time.monotonic() - began < 2
+    assert result["status"] == StageStatus.CANCELLED and result["cancel_reason"] == "merged into INC-0"
+    stages = result["stages"]
+    assert stages["monitor"]["status"] == StageStatus.SUCCEEDED
+    assert stages["triage"]["status"] == StageStatus.CANCELLED and stages["triage"]["duration"] is not None
+    assert stages["fix"]["status"] == StageStatus.CANCELLED and stages["fix"]["started_at"] is None
+
+
+def test_stage_failing_because_of_cancellation_is_reported_as_cancelled():
+    token = CancellationToken()
+
+    async def checks_token(ctx):
+        token.cancel("manual resolution")
+        token.raise_if_cancelled("model call")
+
+    pipeline = IncidentPipeline("p", [Stage("s", checks_token, retries=3)])
+    result = run(pipeline, cancel_token=token)
+    assert result["status"] == StageStatus.CANCELLED
+    assert result["stages"]["s"]["attempts"] == 1  # not retried
+
+
+def test_runner_runs_pipelines_on_its_loop_and_reports_results():
+    runner = PipelineRunner(max_blocking_workers=2)
+    try:
+        done = threading.Event()
+        results = []
+
+        async def blocking_stage(ctx):
+            return await PipelineRunner.run_blocking(lambda a, b: threading.current_thread().name + a + b, "-", "x")
+
+        pipeline = IncidentPipeline("p", [Stage("s", blocking_stage)])
+        future = runner.submit(pipeline, {"incident_id": "INC-9"},
+                               on_done=lambda r: (results.append(r), done.set()))
+        assert future.result(timeout=5)["status"] == StageStatus.SUCCEEDED
+        assert done.wait(5)
+        assert results[0]["stages"]["s"]["result"].startswith("agent-call")
+        assert results[0]["stages"]["s"]["result"].endswith("-x")
+
+        failed = runner.run_coroutine(failing()(None), on_done=results.append)
+        with pytest.raises(RuntimeError):
+            failed.result(timeout=5)
+        assert len(results) == 1  # on_done only fires on success
+    finally:
+        runner.shutdown()
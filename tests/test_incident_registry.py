@@ -0,0 +1,120 @@
+import threading
+
+import pytest
+
+from incident_registry import IncidentRegistry, IncidentState, InvalidTransition
+
+
+def open_incident(registry, service="search", **fields):
+    return registry.open(service, "search_service_outage", "P0", "Search down", "Monitor Agent", **fields)
+
+
+def test_open_indexes_incident_by_id_status_and_service():
+    changes = []
+    registry = IncidentRegistry(on_change=changes.append)
+    incident = open_incident(registry, region="eu")
+    assert incident["status"] == "detected" and incident["region"] == "eu"
+    assert registry.get(incident["id"]) is incident
+    assert registry.open_for_service("search") == [incident]
+    assert registry.by_status(IncidentState.DETECTED) == [incident]
+    assert registry.is_open(incident["id"]) and registry.open_count() == 1
+    assert changes == [incident]
+
+
+def test_concurrent_incidents_keep_independent_state_machines():
+    registry = IncidentRegistry()
+    search = open_incident(registry, "search")
+    cart = open_incident(registry, "cart")
+    registry.transition(search["id"], IncidentState.TRIAGING)
+    registry.transition(search["id"], IncidentState.FIXING)
+    assert cart["status"] == "detected"
+    assert [i["id"] for i in registry.by_status(IncidentState.FIXING)] == [search["id"]]
+    assert registry.latest_open()["id"] in {search["id"], cart["id"]}
+    assert {i["id"] for i in registry.open_incidents()} == {search["id"], cart["id"]}
+
+
+def test_disallowed_transitions_are_rejected_and_leave_state_unchanged():
+    registry = IncidentRegistry()
+    incident = open_incident(registry)
+    with pytest.raises(InvalidTransition):
+        registry.transition(incident["id"], IncidentState.VERIFYING)
+    assert incident["status"] == "detected"
+    registry.resolve(incident["id"], "fixed")
+    with pytest.raises(InvalidTransition):
+        registry.transition(incident["id"], IncidentState.TRIAGING)  # RESOLVED is terminal
+    with pytest.raises(KeyError):
+        registry.transition("INC-missing", IncidentState.TRIAGING)
+
+
+def test_same_state_transition_only_updates_fields():
+    registry = IncidentRegistry()
+    incident = open_incident(registry)
+    registry.transition(incident["id"], IncidentState.DETECTED, note="still detecting")
+    assert incident["note"] == "still detecting" and len(incident["transitions"]) == 1
+
+
+def test_resolve_records_timing_and_removes_from_open_indexes():
+    registry = IncidentRegistry()
+    incident = open_incident(registry)
+    registry.resolve(incident["id"], "Index rebuilt")
+    assert not registry.is_open(incident["id"])
+    assert registry.open_for_service("search") == [] and registry.open_count() == 0
+    assert incident["resolution"] == "Index rebuilt" and incident["resolution_time_seconds"] >= 0
+    assert registry.history() == [incident]
+    assert registry.avg_resolution_time() == pytest.approx(incident["resolution_time_seconds"])
+
+
+def test_history_is_bounded_and_evicts_oldest_resolved():
+    registry = IncidentRegistry(max_history=3)
+    ids = []
+    for _ in range(5):
+        incident = open_incident(registry)
+        registry.resolve(incident["id"], "fixed")
+        ids.append(incident["id"])
+    assert [i["id"] for i in registry.history(10)] == ids[2:]
+    assert registry.get(ids[0]) is None and registry.get(ids[4]) is not None
+    assert len(registry.by_status(IncidentState.RESOLVED)) == 3
+    assert registry.history(0) == []
+    assert registry.total_incidents() == 5
+
+
+def test_success_rate_counts_escalations_as_unsuccessful():
+    registry = IncidentRegistry()
+    assert registry.success_rate() == 100.0
+    resolved, escalated = open_incident(registry), open_incident(registry)
+    registry.resolve(resolved["id"], "fixed")
+    registry.transition(escalated["id"], IncidentState.ESCALATED)
+    assert registry.success_rate() == 50.0
+
+
+def test_restore_reindexes_persisted_incident_in_its_state():
+    registry = IncidentRegistry()
+    incident = {"id": "INC-1-abcd", "service": "search", "status": "fixing", "started_at": 0.0, "transitions": []}
+    registry.restore(incident)
+    assert registry.open_for_service("search") == [incident]
+    registry.transition("INC-1-abcd", IncidentState.VERIFYING)
+    assert registry.by_status(IncidentState.VERIFYING) == [incident]
+
+
+def test_concurrent_opens_and_resolves_keep_indexes_consistent():
+    registry = IncidentRegistry(max_history=1000)
+
+    def worker():
+        for _ in range(100):
+            incident = open_incident(registry)
+            registry.transition(incident["id"], IncidentState.TRIAGING)
+            registry.resolve(incident["id"], "fixed")
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert registry.open_count() == 0 and registry.open_for_service("search") == []
+    assert registry.stats["opened"] == registry.stats["resolved"] == 800
+
+
+def test_incident_ids_are_unique_during_a_failure_storm():
+    registry = IncidentRegistry()
+    ids = {open_incident(registry)["id"] for _ in range(5000)}
+    assert len(ids) == 5000 and registry.open_count() == 5000
@@ -0,0 +1,96 @@
+import asyncio
+import os
+import threading
+
+import pytest
+
+pytest.importorskip("agent_framework")
+
+from cancellation import CancellationToken  # noqa: E402
+from incident_pipeline import PipelineRunner, Stage, StageStatus  # noqa: E402
+from incident_workflow import CHECKPOINTS_SUBDIR, INCIDENT_FILE, SHUTDOWN_REASON, IncidentWorkflowRunner  # noqa: E402
+
+
+@pytest.fixture
+def runner():
+    runner = PipelineRunner(max_blocking_workers=2)
+    yield runner
+    runner.shutdown()
+
+
+def build(runner, checkpoint_dir, fix_started=None, fix_release=None):
+    async def quick(ctx):
+        return "ok"
+
+    async def fix(ctx):
+        if fix_started:
+            fix_started.set()
+        while fix_release is not None and not fix_release.is_set():
+            await asyncio.sleep(0.01)
+        return "fixed"
+
+    stages = [
+        Stage("monitor", quick),
+        Stage("triage", quick, depends_on=["monitor"]),
+        Stage("notify", quick, depends_on=["monitor"]),
+        Stage("fix", fix, depends_on=["triage", "notify"]),
+    ]
+    snapshot = lambda incident_id: {"id": incident_id, "service": "search", "status": "fixing"}  # noqa: E731
+    return IncidentWorkflowRunner("p", stages, runner, str(checkpoint_dir), snapshot=snapshot)
+
+
+def test_completed_run_removes_its_checkpoints(runner, tmp_path):
+    workflow = build(runner, tmp_path)
+    result = workflow.submit("INC-1").result(timeout=30)
+    assert result["status"] == StageStatus.SUCCEEDED
+    assert not os.path.exists(tmp_path / "INC-1")
+
+
+def test_shutdown_keeps_checkpoints_outside_the_incident_file(runner, tmp_path):
+    started, release = threading.Event(), threading.Event()
+    workflow = build(runner, tmp_path, started, release)
+    token = CancellationToken("INC-1")
+    future = workflow.submit("INC-1", token)
+    assert started.wait(30)
+    token.cancel(SHUTDOWN_REASON)
+    result = future.result(timeout=30)
+
+    assert result["status"] == StageStatus.CANCELLED and result["checkpoints_kept"]
+    assert os.path.isfile(tmp_path / "INC-1" / INCIDENT_FILE)
+    checkpoints = tmp_path / "INC-1" / CHECKPOINTS_SUBDIR
+    assert os.listdir(checkpoints)
+    assert INCIDENT_FILE not in os.listdir(checkpoints)
+
+
+@pytest.mark.parametrize("reason", ["merged into INC-0", "manual resolution"])
+def test_cancel_for_merge_or_manual_fix_removes_checkpoints(runner, tmp_path, reason):
+    started, release = threading.Event(), threading.Event()
+    workflow = build(runner, tmp_path, started, release)
+    token = CancellationToken("INC-1")
+    future = workflow.submit("INC-1", token)
+    assert started.wait(30)
+    token.cancel(reason)
+    result = future.result(timeout=30)
+    assert result["status"] == StageStatus.CANCELLED and not result.get("checkpoints_kept")
+    assert not os.path.exists(tmp_path / "INC-1")
+
+
+def test_shutdown_checkpoint_is_resumed_without_rerunning_finished_stages(runner, tmp_path):
+    started, release = threading.Event(), threading.Event()
+    workflow = build(runner, tmp_path, started, release)
+    token = CancellationToken("INC-1")
+    future = workflow.submit("INC-1", token)
+    assert started.wait(30)
+    token.cancel(SHUTDOWN_REASON)
+    future.result(timeout=30)
+
+    release.set()
+    restored, results, done = [], [], threading.Event()
+    resumed = build(runner, tmp_path).resume_pending(
+        lambda incident: (restored.append(incident), CancellationToken(incident["id"]))[1],
+        on_done=lambda r: (results.append(r), done.set()))
+    assert resumed == ["INC-1"] and restored[0]["id"] == "INC-1"
+    assert done.wait(30)
+    assert results[0]["status"] == StageStatus.SUCCEEDED
+    assert results[0]["stages"]["monitor"]["attempts"] <= 1
+    assert not os.path.exists(tmp_path / "INC-1")
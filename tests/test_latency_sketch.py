@@ -0,0 +1,110 @@
+import random
+
+import pytest
+
+from latency_sketch import QUANTILES, QuantileSketch, SketchRegistry
+
+
+def true_quantile(values, q):
+    ordered = sorted(values)
+    return ordered[int(q * (len(ordered) - 1))]
+
+
+def assert_within(sketch, values, q, accuracy):
+    expected = true_quantile(values, q)
+    assert sketch.quantile(q) == pytest.approx(expected, rel=accuracy * 1.01), q
+
+
+@pytest.fixture
+def latencies():
+    rng = random.Random(42)
+    return [rng.lognormvariate(-1.5, 1.0) for _ in range(20000)]
+
+
+def test_quantiles_are_within_the_relative_accuracy(latencies):
+    sketch = QuantileSketch(relative_accuracy=0.01)
+    for value in latencies:
+        sketch.add(value)
+    for q in QUANTILES.values():
+        assert_within(sketch, latencies, q, 0.01)
+    for q in (0.0, 1.0):
+        assert_within(sketch, latencies, q, 0.01)
+
+
+def test_bucket_collapse_bounds_memory_and_keeps_upper_quantiles_accurate():
+    # six decades at 1% accuracy need ~700 buckets; 64 only cover the top ~3.5x
+    values = [10 ** (-3 + 6 * i / 9999) for i in range(10000)]
+    sketch = QuantileSketch(relative_accuracy=0.01, max_buckets=64)
+    for value in values:
+        sketch.add(value)
+    assert len(sketch.buckets) <= 64
+    for q in (0.95, 0.99, 0.999):
+        assert_within(sketch, values, q, 0.01)
+    # collapsed low buckets fold upward: small quantiles are overestimated, never under
+    assert sketch.quantile(0.5) >= true_quantile(values, 0.5)
+    assert sketch.count == len(values) and sketch.min == values[0] and sketch.max == values[-1]
+
+
+def test_merge_matches_a_single_sketch(latencies):
+    whole, left, right = QuantileSketch(), QuantileSketch(), QuantileSketch()
+    for i, value in enumerate(latencies):
+        whole.add(value)
+        (left if i % 2 else right).add(value)
+    left.merge(right)
+    assert left.buckets == whole.buckets and left.count == whole.count
+    assert left.quantiles(QUANTILES) == whole.quantiles(QUANTILES)
+
+
+def test_merge_collapses_to_the_bucket_limit():
+    low, high = QuantileSketch(max_buckets=16), QuantileSketch(max_buckets=16)
+    for i in range(16):
+        low.add(0.001 * 1.05 ** i)
+        high.add(100 * 1.05 ** i)
+    low.merge(high)
+    assert len(low.buckets) <= 16 and low.count == 32
+
+
+def test_merge_rejects_different_accuracy():
+    with pytest.raises(ValueError, match="relative accuracy"):
+        QuantileSketch(0.01).merge(QuantileSketch(0.05))
+
+
+def test_tiny_values_count_as_zero():
+    sketch = QuantileSketch(min_value=1e-6)
+    for value in (0.0, 1e-9, 0.5, 0.5):
+        sketch.add(value)
+    assert sketch.zero_count == 2 and sketch.quantile(0.0) == 0.0
+    assert sketch.quantile(0.99) == pytest.approx(0.5, rel=0.01)
+
+
+def test_empty_sketch_snapshot():
+    assert QuantileSketch().snapshot() == {"count": 0, "mean": None, "min": None, "max": None,
+                                           "p50": None, "p95": None, "p99": None, "p999": None}
+
+
+def test_cumulative_counts_per_bound():
+    sketch = QuantileSketch()
+    for value in (0.0, 0.05, 0.2, 0.2, 1.5, 7.0):
+        sketch.add(value)
+    assert sketch.cumulative_counts([0.1, 0.5, 1.0, 5.0, 10.0]) == [2, 4, 4, 5, 6]
+
+
+def test_registry_snapshots_per_kind_key_and_merged():
+    registry = SketchRegistry()
+    for value in (0.1, 0.2, 0.3):
+        registry.record("endpoint", "/api/search", value)
+    registry.record("endpoint", "/api/cart", 1.0)
+    registry.record("model", "gpt-4o", 2.0)
+
+    everything = registry.snapshot()
+    assert set(everything) == {"endpoint", "model"}
+    assert everything["endpoint"]["_all"]["count"] == 4
+    assert everything["endpoint"]["/api/search"]["count"] == 3
+
+    assert set(registry.snapshot("model")) == {"model"}
+    assert registry.snapshot("endpoint", "/api/cart")["endpoint"]["/api/cart"]["max"] == 1.0
+    assert registry.snapshot("endpoint", "/missing") == {"endpoint": {}}
+
+    histograms = registry.histograms("endpoint", [0.25, 5.0])
+    assert histograms["/api/search"] == {"buckets": [2, 3], "count": 3, "sum": pytest.approx(0.6)}
+    assert registry.histograms("unknown", [1.0]) == {}
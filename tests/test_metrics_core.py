@@ -0,0 +1,84 @@
+import gc
+import threading
+
+from metrics_core import AppendBuffer, ShardedCounter
+
+
+def run_threads(count, target):
+    threads = [threading.Thread(target=target) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def test_counts_are_exact_across_threads():
+    counter = ShardedCounter()
+    ready = threading.Barrier(9, timeout=10)
+    holding = threading.Event()
+
+    def work():
+        for _ in range(10000):
+            counter.add("requests")
+            counter.add("tokens", 2.5)
+        ready.wait()
+        holding.wait()
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    ready.wait()  # every thread has finished counting but is still alive
+    assert counter.shard_count() == 8
+    assert counter.get("requests") == 80000 and counter.get("tokens") == 200000
+    holding.set()
+    for thread in threads:
+        thread.join()
+
+
+def test_shards_of_finished_threads_are_retired_into_the_totals():
+    counter = ShardedCounter(("requests", "errors"))
+    run_threads(50, lambda: counter.add("requests", 3))
+    gc.collect()
+    assert counter.shard_count() == 0
+    assert counter.snapshot() == {"requests": 150, "errors": 0}
+    counter.add("requests")
+    assert counter.get("requests") == 151 and counter.shard_count() == 1
+
+
+def test_snapshot_reports_declared_keys_at_zero():
+    counter = ShardedCounter(("hits", "misses"))
+    assert counter.snapshot() == {"hits": 0, "misses": 0}
+    counter.add("extra", 4)
+    assert counter.snapshot() == {"hits": 0, "misses": 0, "extra": 4}
+    assert counter.get("unknown") == 0
+
+
+def test_append_buffer_is_bounded_but_counts_everything():
+    buffer = AppendBuffer(maxlen=3)
+    for i in range(5):
+        buffer.append(i)
+    assert buffer.snapshot() == [2, 3, 4] and len(buffer) == 3
+    assert buffer.snapshot(last=2) == [3, 4]
+    assert buffer.total() == 5
+
+
+def test_append_buffer_snapshots_while_writers_append():
+    buffer = AppendBuffer(maxlen=1000)
+    done = threading.Event()
+
+    def writer():
+        i = 0
+        while not done.is_set():
+            buffer.append(i)
+            i += 1
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    try:
+        for _ in range(200):
+            items = buffer.snapshot()
+            assert items == sorted(items) and len(items) <= 1000
+    finally:
+        done.set()
+        thread.join()
+    assert buffer.total() >= len(buffer)
@@ -0,0 +1,57 @@
+import math
+
+from latency_sketch import SketchRegistry
+from openmetrics import OpenMetricsWriter
+
+
+def test_counter_and_gauge_families():
+    writer = OpenMetricsWriter(prefix="agentic_")
+    writer.counter("tokens", "Tokens used", [({"model": "gpt-4o"}, 1200), ({"model": "gpt-4o-mini"}, 0.5)])
+    writer.gauge("open_incidents", "Open incidents", [({}, 3), ({"service": "cart"}, None)])
+    assert writer.render() == (
+        "# TYPE agentic_tokens counter\n"
+        "# HELP agentic_tokens Tokens used\n"
+        'agentic_tokens_total{model="gpt-4o"} 1200\n'
+        'agentic_tokens_total{model="gpt-4o-mini"} 0.5\n'
+        "# TYPE agentic_open_incidents gauge\n"
+        "# HELP agentic_open_incidents Open incidents\n"
+        "agentic_open_incidents 3\n"
+        "# EOF\n"
+    )
+
+
+def test_units_numbers_and_escaping():
+    writer = OpenMetricsWriter()
+    writer.gauge("uptime", 'Uptime "wall"\nclock', [({"host": 'a"b\\c'}, 12.0), ({"up": "x"}, True),
+                                                     ({"inf": "x"}, math.inf)], unit="seconds")
+    lines = writer.render().splitlines()
+    assert lines[:3] == ["# TYPE uptime gauge", "# UNIT uptime seconds", '# HELP uptime Uptime \\"wall\\"\\nclock']
+    assert lines[3] == 'uptime{host="a\\"b\\\\c"} 12'
+    assert lines[4] == 'uptime{up="x"} 1'
+    assert lines[5] == 'uptime{inf="x"} +Inf'
+
+
+def test_histogram_buckets_are_cumulative_and_end_with_inf():
+    registry = SketchRegistry()
+    for value in (0.002, 0.02, 0.02, 0.3, 45.0):
+        registry.record("endpoint", "/api/search", value)
+    bounds = [0.01, 0.1, 1.0]
+    writer = OpenMetricsWriter()
+    writer.histogram("request_duration", "Request latency", "endpoint",
+                     registry.histograms("endpoint", bounds), bounds)
+    lines = writer.render().splitlines()
+    assert lines[:3] == ["# TYPE request_duration histogram", "# UNIT request_duration seconds",
+                         "# HELP request_duration Request latency"]
+    assert lines[3:8] == [
+        'request_duration_bucket{endpoint="/api/search",le="0.01"} 1',
+        'request_duration_bucket{endpoint="/api/search",le="0.1"} 3',
+        'request_duration_bucket{endpoint="/api/search",le="1.0"} 4',
+        'request_duration_bucket{endpoint="/api/search",le="+Inf"} 5',
+        'request_duration_count{endpoint="/api/search"} 5',
+    ]
+    assert lines[8].startswith('request_duration_sum{endpoint="/api/search"} 45.34')
+    assert lines[-1] == "# EOF"
+
+
+def test_empty_exposition_is_just_eof():
+    assert OpenMetricsWriter().render() == "# EOF\n"
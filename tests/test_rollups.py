@@ -0,0 +1,89 @@
+import pytest
+
+from rollups import RollupSeries, Rollups
+
+
+def test_window_counts_and_sums_recent_events():
+    series = RollupSeries()
+    for t in (100.2, 101.5, 102.7, 103.1):
+        series.add(2.0, now=t)
+    window = series.window(10, now=104.0)
+    assert window["resolution"] == "second"
+    assert window["count"] == 4 and window["sum"] == pytest.approx(8.0)
+    assert window["rate_per_second"] == pytest.approx(0.4)
+    assert series.total_count == 4 and series.total_sum == 8.0
+
+
+def test_oldest_bucket_is_pro_rated():
+    series = RollupSeries()
+    series.add(10.0, now=995.2)
+    series.add(10.0, now=1005.0)
+    # window starts half way through the 995 bucket
+    window = series.window(10, now=1005.5)
+    assert window["sum"] == pytest.approx(15.0)
+
+
+def test_old_events_fall_outside_the_window():
+    series = RollupSeries()
+    series.add(now=10.0)
+    series.add(now=70.0)
+    assert series.window(30, now=75.0)["count"] == 1
+
+
+@pytest.mark.parametrize("seconds, resolution", [
+    (60, "second"), (120, "second"), (3600, "minute"), (86400, "hour"), (30 * 86400, "hour"),
+])
+def test_finest_resolution_that_covers_the_window_in_few_buckets(seconds, resolution):
+    assert RollupSeries().ring_for(seconds).name == resolution
+
+
+def test_explicit_and_unknown_resolutions():
+    series = RollupSeries()
+    assert series.ring_for(60, "hour").name == "hour"
+    with pytest.raises(ValueError, match="Unknown resolution"):
+        series.ring_for(60, "week")
+
+
+def test_windows_longer_than_the_retention_are_clamped():
+    window = RollupSeries().window(10 ** 8, now=0.0)
+    assert window["resolution"] == "hour" and window["window_seconds"] == 3600 * 720
+
+
+def test_ring_slots_are_reused_after_a_full_revolution():
+    series = RollupSeries()
+    series.add(now=10.0)
+    series.add(now=3610.0)  # same second-ring slot, one hour later
+    second = series.rings[0]
+    assert second.bucket(10) == (0, 0.0)
+    assert second.bucket(3610) == (1, 1.0)
+    # the minute ring still has both
+    assert series.window(3600, now=3610.0)["count"] == 2
+
+
+def test_buckets_are_oldest_first_with_ages():
+    series = RollupSeries()
+    series.add(1.0, now=100.0)
+    series.add(3.0, now=102.0)
+    series.add(4.0, now=102.5)
+    points = series.buckets(3, now=102.5)
+    assert [p["count"] for p in points] == [1, 0, 2]
+    assert [p["sum"] for p in points] == [1.0, 0.0, 7.0]
+    assert [p["age_seconds"] for p in points] == [2.5, 1.5, 0.5]
+    assert len(series.buckets(2 * 60, resolution="minute", now=102.5)) == 2
+
+
+def test_registry_reads_of_unknown_series():
+    rollups = Rollups()
+    assert rollups.count("missing", 60) == 0
+    assert rollups.window("missing", 60)["resolution"] is None
+    assert rollups.buckets("missing", 60) == []
+
+
+def test_registry_tracks_named_series():
+    rollups = Rollups()
+    rollups.add("requests")
+    rollups.add("requests")
+    rollups.add("tokens", 150)
+    assert rollups.names() == ["requests", "tokens"]
+    assert rollups.count("requests", 60) == 2
+    assert rollups.totals() == {"requests": {"count": 2, "sum": 2.0}, "tokens": {"count": 1, "sum": 150.0}}
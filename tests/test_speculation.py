@@ -0,0 +1,144 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from incident_pipeline import PipelineRunner
+from speculation import SpeculativeRuns
+from timer_wheel import TimerWheel
+
+
+@pytest.fixture
+def runner():
+    runner = PipelineRunner(max_blocking_workers=2)
+    yield runner
+    runner.shutdown()
+
+
+@pytest.fixture
+def timers():
+    timers = TimerWheel(tick_seconds=0.01, slots=8)
+    yield timers
+    timers.shutdown()
+
+
+def work(delay, tokens=100, seen=None):
+    """Factory for a speculative run that sleeps, then reports its token spend"""
+    def factory(token):
+        async def run():
+            if seen is not None:
+                seen.append(token)
+            await asyncio.sleep(delay)
+            return {"diagnosis": "pool exhausted", "tokens": tokens}
+        return run()
+    return factory
+
+
+def wait_until(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.005)
+    return False
+
+
+def test_one_warm_run_per_key_and_claim_reuses_its_result(runner, timers):
+    runs = SpeculativeRuns(runner, timers, ttl_seconds=60)
+    assert runs.start("search", work(0.01))
+    assert not runs.start("search", work(0.01))
+    assert wait_until(lambda: runs.warm()["search"]["ready"])
+
+    entry = runs.claim("search")
+    assert entry["result"]["diagnosis"] == "pool exhausted"
+    assert runs.claim("search") is None and runs.warm() == {}
+    assert timers.pending() == 0
+    stats = runs.stats()
+    assert stats["started"] == 1 and stats["claimed"] == 1 and stats["tokens_spent"] == 100
+    assert stats["tokens_wasted"] == 0
+
+
+def test_discard_cancels_a_running_speculation(runner, timers):
+    runs = SpeculativeRuns(runner, timers, ttl_seconds=60)
+    seen = []
+    runs.start("cart", work(5, seen=seen))
+    assert wait_until(lambda: seen)
+    entry = runs._entries["cart"]
+
+    assert runs.discard("cart", "signal cleared")
+    assert not runs.discard("cart")
+    assert seen[0].cancelled and seen[0].reason == "signal cleared"
+    assert wait_until(entry["future"].cancelled)
+    assert runs.stats()["discarded"] == 1 and runs.stats()["tokens_spent"] == 0
+
+
+def test_discarding_a_finished_run_counts_its_tokens_as_wasted(runner, timers):
+    runs = SpeculativeRuns(runner, timers, ttl_seconds=60)
+    runs.start("search", work(0, tokens=250))
+    assert wait_until(lambda: runs.warm()["search"]["ready"])
+    runs.discard("search")
+    assert runs.stats()["tokens_wasted"] == 250
+
+
+def test_unclaimed_runs_expire_after_their_ttl(runner, timers):
+    runs = SpeculativeRuns(runner, timers, ttl_seconds=0.05)
+    runs.start("search", work(5))
+    assert wait_until(lambda: runs.stats()["expired"] == 1)
+    assert runs.warm() == {} and runs.claim("search") is None
+
+
+def test_a_timed_out_waiter_does_not_cancel_the_run_for_others(runner, timers):
+    runs = SpeculativeRuns(runner, timers, ttl_seconds=60)
+    runs.start("search", work(0.2))
+    entry = runs.claim("search")
+
+    async def two_stages():
+        return await asyncio.gather(SpeculativeRuns.result(entry, timeout=0.01),
+                                    SpeculativeRuns.result(entry, timeout=2))
+
+    impatient, patient = asyncio.run(two_stages())
+    assert impatient is None
+    assert patient["diagnosis"] == "pool exhausted"
+    assert not entry["future"].cancelled()
+
+
+def test_result_of_a_cancelled_run_is_none(runner, timers):
+    runs = SpeculativeRuns(runner, timers, ttl_seconds=60)
+    runs.start("search", work(5))
+    entry = runs._entries["search"]
+    runs.discard("search")
+    assert asyncio.run(SpeculativeRuns.result(entry, timeout=1)) is None
+
+
+def test_entries_are_complete_when_claimed_concurrently_with_start(runner, timers):
+    runs = SpeculativeRuns(runner, timers, ttl_seconds=60)
+    claimed, stop = [], threading.Event()
+
+    def claimer():
+        while not stop.is_set():
+            entry = runs.claim("hot")
+            if entry is not None:
+                claimed.append(entry)
+
+    thread = threading.Thread(target=claimer)
+    thread.start()
+    for _ in range(200):
+        runs.start("hot", work(0))
+    stop.set()
+    thread.join()
+    leftover = runs.claim("hot")
+    if leftover is not None:
+        claimed.append(leftover)
+
+    assert len(claimed) == runs.stats()["started"]
+    assert all("future" in e and "timer" in e for e in claimed)
+    assert timers.pending() == 0
+
+
+def test_shutdown_discards_everything_warm(runner, timers):
+    runs = SpeculativeRuns(runner, timers, ttl_seconds=60)
+    runs.start("a", work(5))
+    runs.start("b", work(5))
+    runs.shutdown()
+    assert runs.warm() == {} and runs.stats()["discarded"] == 2
@@ -0,0 +1,116 @@
+import threading
+import time
+
+import pytest
+
+from timer_wheel import TimerWheel
+
+
+@pytest.fixture
+def wheel():
+    wheel = TimerWheel(tick_seconds=0.01, slots=8)
+    yield wheel
+    wheel.shutdown()
+
+
+def fired_at(wheel, delay):
+    """Schedule a timer and return (event, started, timestamps)"""
+    done, times = threading.Event(), []
+    started = time.monotonic()
+    wheel.schedule(delay, lambda: (times.append(time.monotonic() - started), done.set()))
+    return done, times
+
+
+def test_timer_fires_once_after_its_delay(wheel):
+    done, times = fired_at(wheel, 0.05)
+    assert done.wait(2)
+    assert times[0] >= 0.04
+    time.sleep(0.1)
+    assert len(times) == 1
+    assert wheel.pending() == 0 and wheel.stats()["fired"] == 1
+
+
+def test_delays_longer_than_one_revolution_wait_extra_rounds(wheel):
+    # 8 slots x 10ms = 80ms per revolution; 0.25s needs three rounds
+    done, times = fired_at(wheel, 0.25)
+    assert not done.wait(0.15)
+    assert done.wait(2)
+    assert times[0] >= 0.24
+
+
+def test_arguments_are_passed_to_the_callback(wheel):
+    received, done = [], threading.Event()
+    wheel.schedule(0.01, lambda *a, **k: (received.append((a, k)), done.set()), "banner-1", reason="expired")
+    assert done.wait(2)
+    assert received == [(("banner-1",), {"reason": "expired"})]
+
+
+def test_cancelled_timer_never_fires(wheel):
+    fired = []
+    timer_id = wheel.schedule(0.05, fired.append, "x")
+    assert wheel.cancel(timer_id) is True
+    assert wheel.cancel(timer_id) is False  # already cancelled
+    time.sleep(0.15)
+    assert fired == [] and wheel.pending() == 0
+    assert wheel.stats()["cancelled"] == 1
+
+
+def test_cancel_after_firing_returns_false(wheel):
+    done = threading.Event()
+    timer_id = wheel.schedule(0.01, done.set)
+    assert done.wait(2)
+    assert wheel.cancel(timer_id) is False
+
+
+def test_rearm_replaces_the_pending_timer(wheel):
+    fired = []
+    first = wheel.schedule(0.05, fired.append, "first")
+    time.sleep(0.03)
+    assert wheel.cancel(first)
+    done = threading.Event()
+    wheel.schedule(0.05, lambda: (fired.append("second"), done.set()))
+    assert done.wait(2)
+    time.sleep(0.05)
+    assert fired == ["second"]
+
+
+def test_callbacks_can_rearm_from_the_wheel_thread(wheel):
+    fired, done = [], threading.Event()
+
+    def tick():
+        fired.append(time.monotonic())
+        if len(fired) < 3:
+            wheel.schedule(0.02, tick)  # the wheel lock is not held while callbacks run
+        else:
+            done.set()
+
+    wheel.schedule(0.02, tick)
+    assert done.wait(2)
+    assert len(fired) == 3
+
+
+def test_failing_callback_is_counted_and_the_wheel_keeps_running(wheel):
+    def broken():
+        raise RuntimeError("boom")
+
+    wheel.schedule(0.01, broken)
+    done, _ = fired_at(wheel, 0.03)
+    assert done.wait(2)
+    assert wheel.stats()["errors"] == 1
+
+
+def test_many_timers_fire_from_a_single_thread(wheel):
+    threads, lock, done = set(), threading.Lock(), threading.Event()
+    remaining = [200]
+
+    def record():
+        with lock:
+            threads.add(threading.current_thread().name)
+            remaining[0] -= 1
+            if remaining[0] == 0:
+                done.set()
+
+    for i in range(200):
+        wheel.schedule(0.01 * (i % 20), record)
+    assert done.wait(5)
+    assert threads == {"timer-wheel"}
@@ -0,0 +1,88 @@
+import asyncio
+import threading
+
+import pytest
+
+import tracing
+
+
+@pytest.fixture
+def disabled(monkeypatch):
+    monkeypatch.setattr(tracing, "_tracer", None)
+
+
+def test_unknown_exporter_is_rejected():
+    with pytest.raises(ValueError, match="Unknown tracing exporter"):
+        tracing.configure("demo", exporter="jaeger")
+
+
+def test_none_exporter_leaves_tracing_off(disabled):
+    assert tracing.configure("demo", exporter="none") is False
+    assert not tracing.enabled()
+
+
+def test_missing_sdk_leaves_tracing_off(disabled, monkeypatch, tmp_path):
+    monkeypatch.setattr(tracing, "TRACING_AVAILABLE", False)
+    assert tracing.configure("demo", exporter="file", path=str(tmp_path / "traces.jsonl")) is False
+    assert not tracing.enabled() and not (tmp_path / "traces.jsonl").exists()
+
+
+def test_helpers_are_no_ops_when_disabled(disabled):
+    with tracing.span("work", {"incident.id": "INC-1"}) as current:
+        assert current is None
+    tracing.set_attributes({"a": 1})
+    tracing.set_error(RuntimeError("boom"))
+    handle = tracing.start_span("request", kind="server")
+    assert handle is None
+    tracing.end_span(handle, {"status": 200})
+    assert tracing.capture() is None
+
+    def func():
+        return threading.current_thread().name
+    assert tracing.bind(func) is func
+
+
+def test_traced_just_awaits_when_disabled(disabled):
+    async def work():
+        return 42
+    assert asyncio.run(tracing.traced(work(), "pipeline", {"pipeline.name": "triage"})) == 42
+
+
+def test_attributes_are_cleaned_for_opentelemetry():
+    assert tracing._clean(None) == {}
+    assert tracing._clean({"a": "x", "b": 1, "c": None, "d": [1, 2], "e": True}) == {
+        "a": "x", "b": 1, "d": "[1, 2]", "e": True}
+
+
+def test_spans_propagate_across_threads_and_link_background_traces(monkeypatch):
+    pytest.importorskip("opentelemetry.sdk")
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+    from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+
+    exporter = InMemorySpanExporter()
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    monkeypatch.setattr(tracing, "_tracer", provider.get_tracer("test"))
+
+    async def pipeline():
+        with tracing.span("stage"):
+            return "done"
+
+    def blocking_call():
+        with tracing.span("blocking call"):
+            pass
+
+    with tracing.span("request", kind="server") as request:
+        worker = threading.Thread(target=tracing.bind(blocking_call))
+        trigger = tracing.capture()
+    worker.start()
+    worker.join()
+    assert asyncio.run(tracing.traced(pipeline(), "pipeline", trigger=trigger)) == "done"
+
+    spans = {s.name: s for s in exporter.get_finished_spans()}
+    request_trace = request.get_span_context().trace_id
+    assert spans["blocking call"].parent.span_id == request.get_span_context().span_id
+    assert spans["pipeline"].context.trace_id != request_trace
+    assert spans["pipeline"].links[0].context.span_id == request.get_span_context().span_id
+    assert spans["stage"].parent.span_id == spans["pipeline"].context.span_id
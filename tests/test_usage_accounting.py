@@ -0,0 +1,84 @@
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from usage_accounting import UsageLedger, compute_cost, estimate_usage, extract_usage
+
+
+def test_extract_usage_reads_chat_completion_objects_with_cached_tokens():
+    usage = SimpleNamespace(prompt_tokens=1200, completion_tokens=300, total_tokens=1500,
+                            prompt_tokens_details=SimpleNamespace(cached_tokens=1024))
+    assert extract_usage(usage) == {"prompt_tokens": 1200, "cached_tokens": 1024,
+                                    "completion_tokens": 300, "total_tokens": 1500}
+
+
+def test_extract_usage_reads_transcription_and_agent_framework_fields():
+    transcription = {"input_tokens": 80, "output_tokens": 20, "input_tokens_details": {"cached_tokens": 0}}
+    assert extract_usage(transcription)["total_tokens"] == 100
+    agent_framework = SimpleNamespace(input_token_count=40, output_token_count=10, total_token_count=50)
+    assert extract_usage(agent_framework) == {"prompt_tokens": 40, "cached_tokens": 0,
+                                              "completion_tokens": 10, "total_tokens": 50}
+    assert extract_usage(None)["total_tokens"] == 0
+
+
+def test_cached_prompt_tokens_are_billed_at_the_cached_rate():
+    usage = {"prompt_tokens": 1_000_000, "cached_tokens": 400_000, "completion_tokens": 100_000}
+    # gpt-4o: 600k uncached at $2.50, 400k cached at $1.25, 100k output at $10
+    assert compute_cost("gpt-4o", usage) == pytest.approx(1.5 + 0.5 + 1.0)
+    # cached can never exceed prompt tokens
+    assert compute_cost("gpt-4o", {**usage, "cached_tokens": 5_000_000}) == pytest.approx(1.25 + 1.0)
+
+
+def test_unknown_models_use_default_pricing():
+    usage = {"prompt_tokens": 1_000_000, "cached_tokens": 0, "completion_tokens": 0}
+    assert compute_cost("not-a-model", usage) == pytest.approx(2.50)
+
+
+def test_estimated_usage_is_flagged_on_the_entry():
+    ledger = UsageLedger()
+    entry = ledger.record("monitor", "gpt-4o-mini", estimate_usage("x" * 400, "y" * 40))
+    assert entry["estimated"] is True
+    assert entry["prompt_tokens"] == 100 and entry["completion_tokens"] == 10
+
+
+def test_ledger_aggregates_by_agent_model_incident_and_bucket():
+    ledger = UsageLedger(bucket_seconds=60)
+    usage = {"prompt_tokens": 100, "completion_tokens": 50, "total_tokens": 150}
+    ledger.record("triage", "gpt-4o", usage, incident_id="INC-1", timestamp=120.0)
+    ledger.record("triage", "gpt-4o", usage, incident_id="INC-1", timestamp=170.0)
+    ledger.record("monitor", "gpt-4o-mini", usage, timestamp=185.0)
+
+    snapshot = ledger.snapshot()
+    assert snapshot["totals"]["calls"] == 3 and snapshot["totals"]["total_tokens"] == 450
+    assert snapshot["by_agent"]["triage"]["calls"] == 2
+    assert set(snapshot["by_model"]) == {"gpt-4o", "gpt-4o-mini"}
+    assert list(snapshot["by_incident"]) == ["INC-1"]
+    assert [b["bucket_start"] for b in snapshot["time_buckets"]] == [120, 180]
+    assert ledger.agent_totals("nobody")["calls"] == 0
+
+
+def test_ledger_keeps_only_the_newest_buckets():
+    ledger = UsageLedger(bucket_seconds=1, max_buckets=3)
+    for second in range(5):
+        ledger.record("monitor", "gpt-4o-mini", {"prompt_tokens": 1, "completion_tokens": 1}, timestamp=second)
+    snapshot = ledger.snapshot()
+    assert [b["bucket_start"] for b in snapshot["time_buckets"]] == [2, 3, 4]
+    assert snapshot["totals"]["calls"] == 5  # totals are not affected by bucket eviction
+    assert ledger.snapshot(bucket_limit=0)["time_buckets"] == []
+
+
+def test_concurrent_records_are_not_lost():
+    ledger = UsageLedger()
+
+    def worker():
+        for _ in range(500):
+            ledger.record("monitor", "gpt-4o-mini", {"prompt_tokens": 2, "completion_tokens": 1})
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert ledger.snapshot()["totals"]["calls"] == 4000
+    assert ledger.model_totals()["gpt-4o-mini"]["total_tokens"] == 12000